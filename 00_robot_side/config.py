@@ -13,7 +13,7 @@ Environment variable quick reference:
   MAX_LINEAR_VEL, MAX_ANGULAR_VEL
   RTK_PORT, RTK_BAUD, RTK_TIMEOUT, RTK_ENABLED
   DATA_LOG_DIR
-  NAV_LOOKAHEAD_M, NAV_DECEL_RADIUS_M, NAV_ARRIVE_FRAMES, NAV_GPS_TIMEOUT_S
+  NAV_LOOKAHEAD_M, NAV_DECEL_RADIUS_M, NAV_ARRIVE_FRAMES, NAV_GPS_TIMEOUT_S, NAV_IMU_TIMEOUT_S
   NAV_PID_KP, NAV_PID_KI, NAV_PID_KD, NAV_MA_WINDOW
 """
 
@@ -96,6 +96,7 @@ NAV_LOOKAHEAD_M:    float = float(os.environ.get("NAV_LOOKAHEAD_M",    "2.0"))
 NAV_DECEL_RADIUS_M: float = float(os.environ.get("NAV_DECEL_RADIUS_M", "3.0"))   # 减速圆半径
 NAV_ARRIVE_FRAMES:  int   = int(os.environ.get("NAV_ARRIVE_FRAMES",    "5"))     # 连续帧到达判定
 NAV_GPS_TIMEOUT_S:  float = float(os.environ.get("NAV_GPS_TIMEOUT_S",  "5.0"))   # GPS 超时停止
+NAV_IMU_TIMEOUT_S:  float = float(os.environ.get("NAV_IMU_TIMEOUT_S",  "1.0"))   # IMU 控制步骤停滞超时停止
 NAV_PID_KP:         float = float(os.environ.get("NAV_PID_KP",         "0.8"))
 NAV_PID_KI:         float = float(os.environ.get("NAV_PID_KI",         "0.01"))
 NAV_PID_KD:         float = float(os.environ.get("NAV_PID_KD",         "0.05"))
@@ -23,17 +23,7 @@ import threading
 from datetime import datetime
 from pathlib import Path
 
-# ── Logging ────────────────────────────────────────────────
-_py_name = Path(__file__).stem
-Path("log").mkdir(exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(f"log/{_py_name}.log", encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
-)
+# Library module: handlers are configured by the importing script (web_controller.py)
 logger = logging.getLogger(__name__)
 
 _CSV_HEADER = [
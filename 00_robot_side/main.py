@@ -19,6 +19,7 @@ import os
 import signal
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -162,11 +163,20 @@ def run_scripts(
     signal.signal(signal.SIGINT, _terminate_all)
     signal.signal(signal.SIGTERM, _terminate_all)
 
+    # Sleep until a child changes state (SIGCHLD) instead of polling; Windows has no
+    # SIGCHLD, so there the wait falls back to a 0.2 s poll interval.
+    child_event = threading.Event()
+    has_sigchld = hasattr(signal, "SIGCHLD")
+    if has_sigchld:
+        prev_sigchld = signal.signal(signal.SIGCHLD, lambda signum, frame: child_event.set())
+    poll_timeout = None if has_sigchld else 0.2
+
     names = ", ".join(cmd[1] for cmd in cmds)
     logger.info(f"Running: {names} — press Ctrl+C to stop all")
 
     try:
         while True:
+            child_event.clear()  # cleared before the sweep so an exit during it is not missed
             for i, p in enumerate(procs):
                 ret = p.poll()
                 if ret is not None:
@@ -178,7 +188,7 @@ def run_scripts(
                         except subprocess.TimeoutExpired:
                             other.kill()
                     return
-            time.sleep(0.2)
+            child_event.wait(poll_timeout)
     except KeyboardInterrupt:
         _terminate_all()
         for p in procs:
@@ -186,6 +196,9 @@ def run_scripts(
                 p.wait(timeout=3.0)
             except subprocess.TimeoutExpired:
                 p.kill()
+    finally:
+        if has_sigchld:
+            signal.signal(signal.SIGCHLD, prev_sigchld)
 
     signal.signal(signal.SIGINT, signal.default_int_handler)
     signal.signal(signal.SIGTERM, signal.SIG_DFL)
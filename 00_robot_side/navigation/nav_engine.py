@@ -6,7 +6,7 @@ NavigationEngine:
     - 接收 RTK GPS 数据（1 Hz）更新滤波器
     - 管理航点序列、GPS 滤波器、控制器
     - 通过 send_velocity_fn 发出速度指令
-    - 通过 broadcast_fn（异步协程）广播导航状态
+    - 通过 broadcast_fn（事件循环线程内的同步函数）广播导航状态
 
 状态枚举：
     NavState: IDLE | NAVIGATING | FINISHED
@@ -22,9 +22,9 @@ import math
 import threading
 import time
 from enum import Enum, auto
-from typing import Callable, Coroutine
+from typing import Callable
 
-from config import NAV_GPS_TIMEOUT_S, MAX_LINEAR_VEL, MAX_ANGULAR_VEL
+from config import NAV_GPS_TIMEOUT_S, NAV_IMU_TIMEOUT_S, MAX_LINEAR_VEL, MAX_ANGULAR_VEL
 from navigation.geo_utils import haversine_distance, bearing_to_target
 from navigation.waypoint import WaypointManager
 from navigation.gps_filter import MovingAverageFilter, KalmanFilter
@@ -56,14 +56,14 @@ class NavigationEngine:
 
     Args:
         send_velocity_fn : Callable[[float, float], None]，发送速度指令
-        broadcast_fn     : 异步广播函数 async(dict) -> None
+        broadcast_fn     : 广播函数 (dict) -> None，必须在事件循环线程中调用
         loop             : asyncio 事件循环（用于跨线程调度广播）
     """
 
     def __init__(
         self,
         send_velocity_fn: Callable[[float, float], None],
-        broadcast_fn: Callable[[dict], Coroutine],
+        broadcast_fn: Callable[[dict], None],
         loop: asyncio.AbstractEventLoop,
     ) -> None:
         self._send_velocity = send_velocity_fn
@@ -92,6 +92,7 @@ class NavigationEngine:
         self._robot_bearing: float | None = None  # None = 未校准
         self._last_imu_ts:   float = 0.0
         self._last_control_ts: float = 0.0
+        self._last_step_ts:    float = 0.0  # 最近一次 on_imu 驱动控制步骤的时间（看门狗用）
 
         # RTK 状态
         self._fix_quality: int   = 0
@@ -133,6 +134,7 @@ class NavigationEngine:
             self._gps_warning_sent = False
             self._state = NavState.NAVIGATING
             self._last_control_ts = time.time()
+            self._last_step_ts    = self._last_control_ts
 
         logger.info(
             f"NavigationEngine: 导航开始，模式={self._nav_mode.value}，"
@@ -166,6 +168,11 @@ class NavigationEngine:
             self._filter_mode = mode
         logger.info(f"NavigationEngine: 滤波器切换 → {mode.value}")
 
+    @property
+    def is_navigating(self) -> bool:
+        """是否处于导航中（无锁读取，枚举赋值在 GIL 下是原子的）。"""
+        return self._state is NavState.NAVIGATING
+
     def get_status(self) -> dict:
         """返回当前导航状态字典（线程安全）。"""
         with self._lock:
@@ -232,6 +239,7 @@ class NavigationEngine:
 
                 if self._state != NavState.NAVIGATING:
                     return
+                self._last_step_ts = now
 
             # 控制步骤（持锁外执行以减少锁持有时长）
             self._control_step(now)
@@ -267,6 +275,23 @@ class NavigationEngine:
         except Exception as e:
             logger.error(f"NavigationEngine.on_rtk: {e}")
 
+    def check_imu_timeout(self) -> None:
+        """IMU 看门狗（由 web_controller 定时调用，与 IMU 推送无关）。
+
+        控制步骤（含 GPS 超时检测）只由 on_imu 驱动；若 IMU 线程停滞、掉线或罗盘失去校准，
+        导航中超过 NAV_IMU_TIMEOUT_S 未执行控制步骤 → 停止导航并发送停车指令，
+        避免固件继续执行最后一条 V 指令。
+        """
+        with self._lock:
+            if self._state != NavState.NAVIGATING:
+                return
+            age = time.time() - self._last_step_ts
+            if age <= NAV_IMU_TIMEOUT_S:
+                return
+        logger.warning(f"NavigationEngine: IMU 超时 {age:.1f}s 无控制步骤，停止导航")
+        self.stop()
+        self._schedule_broadcast_unsafe({"type": "nav_warning", "msg": "IMU timeout"})
+
     # ── 控制步骤（内部，每 50ms）──────────────────────────
     def _control_step(self, now: float) -> None:
         """核心控制循环，由 on_imu 以约 20 Hz 调用。"""
@@ -357,11 +382,11 @@ class NavigationEngine:
     def _schedule_broadcast(self) -> None:
         """从工作线程安全地调度异步广播（不持锁）。"""
         status = self.get_status()
-        asyncio.run_coroutine_threadsafe(self._broadcast(status), self._loop)
+        self._loop.call_soon_threadsafe(self._broadcast, status)
 
     def _schedule_broadcast_unsafe(self, msg: dict) -> None:
         """已持锁时调度广播（从锁内调用，不再获取锁）。"""
-        asyncio.run_coroutine_threadsafe(self._broadcast(msg), self._loop)
+        self._loop.call_soon_threadsafe(self._broadcast, msg)
 
     def _get_status_unsafe(self) -> dict:
         """不加锁的 get_status 内部版本（已持锁时调用）。"""
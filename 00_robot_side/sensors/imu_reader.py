@@ -2,14 +2,15 @@
 IMU Reader — OAK-D BNO085 via depthai
 
 公共接口：
-    IMUReader(threading.Thread, daemon=True)
-        .get_data() -> dict   — 线程安全获取最新 IMU 快照（对齐 RTKReader 接口）
+    IMUReader(threading.Thread, daemon=True, on_sample=None)
+        on_sample: Callable[[], None] — 每个新样本写入后在 IMU 线程中调用（可选）
+        .get_data() -> dict   — 无锁获取最新 IMU 快照（只读，对齐 RTKReader 接口）
         .is_available -> bool  — depthai pipeline 启动后置 True
 
     quaternion_to_compass(real, i, j, k) -> (bearing, cardinal)
 
     # 向后兼容的模块级全局（已废弃，优先使用 IMUReader.get_data()）
-    imu_lock, imu_data, imu_available
+    imu_data, imu_available
 """
 
 import logging
@@ -17,11 +18,13 @@ import math
 import os
 import threading
 import time
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
-# ── 模块级全局 IMU 数据（线程安全） ─────────────────────────
-imu_lock = threading.Lock()
+# ── 模块级全局 IMU 数据（无锁发布） ─────────────────────────
+# IMU 线程每个样本新建一个 dict 并整体替换 imu_data；名称重绑定在 GIL 下是原子的，
+# 已发布的快照不再被修改，因此读取方无需加锁即可拿到一份完整一致的快照。
 imu_data: dict = {
     "accel":   {"x": 0.0, "y": 0.0, "z": 0.0},
     "gyro":    {"x": 0.0, "y": 0.0, "z": 0.0},
@@ -32,28 +35,37 @@ imu_data: dict = {
         "accuracy":   0,
         "quat":       {"w": 1.0, "x": 0.0, "y": 0.0, "z": 0.0},
     },
-    "ts": 0.0,
+    "ts": 0.0,  # time.monotonic() of last sample (interval use only, not wall-clock)
 }
 imu_available: bool = False  # True once depthai pipeline is running
 
 
 # ── Quaternion → compass bearing ──────────────────────────
+# Resolved once at import (quaternion_to_compass runs for every IMU sample, ≤ 100 Hz)
+_COORD_ENU = os.environ.get("COORD_SYSTEM", "NED").upper() == "ENU"
+_CARDINALS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+_RAD2DEG   = 180.0 / math.pi
+
+
 def quaternion_to_compass(real: float, i: float, j: float, k: float) -> tuple[float, str]:
     """Convert BNO085 ROTATION_VECTOR quaternion to compass bearing [0, 360).
 
     0 = magnetic north, clockwise positive.
-    Coordinate system selectable via COORD_SYSTEM env var (default: NED).
+    Coordinate system selectable via COORD_SYSTEM env var (default: NED), read at import.
     """
-    coord = os.environ.get("COORD_SYSTEM", "NED").upper()
-    yaw_rad = math.atan2(2 * (real * k + i * j), 1 - 2 * (j * j + k * k))
-    if coord == "ENU":
+    # Direct quaternion → yaw (Bernardes & Viollet 2022); equal to 1 - 2(j² + k²) for a unit
+    # quaternion, and scale-invariant so a slightly non-normalised sample still gives the right angle
+    jj = j * j
+    kk = k * k
+    yaw_rad = math.atan2(2 * (real * k + i * j), real * real + i * i - jj - kk)
+    if _COORD_ENU:
         # ENU: yaw is measured counter-clockwise from East; convert to clockwise-from-North bearing
-        bearing = (90.0 - math.degrees(yaw_rad)) % 360.0
+        bearing = (90.0 - yaw_rad * _RAD2DEG) % 360.0
     else:
         # NED: yaw is already a clockwise-from-North bearing
-        bearing = math.degrees(yaw_rad) % 360.0
-    cardinals = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
-    cardinal  = cardinals[int((bearing + 22.5) / 45.0) % 8]
+        bearing = (yaw_rad * _RAD2DEG) % 360.0
+    # bearing ∈ [0, 360) → bucket ∈ [0, 8]; & 7 folds 8 (≥ 337.5°) back onto N
+    cardinal = _CARDINALS[int(bearing * (1.0 / 45.0) + 0.5) & 7]
     return bearing, cardinal
 
 
@@ -64,8 +76,9 @@ class IMUReader(threading.Thread):
     优先使用 get_data() / is_available 属性访问数据，而非直接读取模块级全局变量。
     """
 
-    def __init__(self) -> None:
+    def __init__(self, on_sample: Callable[[], None] | None = None) -> None:
         super().__init__(name="IMUReader", daemon=True)
+        self._on_sample = on_sample
 
     @property
     def is_available(self) -> bool:
@@ -73,9 +86,12 @@ class IMUReader(threading.Thread):
         return imu_available
 
     def get_data(self) -> dict:
-        """线程安全地返回最新 IMU 快照（对齐 RTKReader.get_data() 接口）。"""
-        with imu_lock:
-            return dict(imu_data)
+        """返回最新 IMU 快照（对齐 RTKReader.get_data() 接口）。
+
+        每个样本都会发布一个新建的 dict，之后不再修改，因此直接返回引用，既不复制也不加锁；
+        调用方须将其视为只读。
+        """
+        return imu_data
 
     def run(self) -> None:
         global imu_available
@@ -91,8 +107,9 @@ class IMUReader(threading.Thread):
                 imu_node.enableIMUSensor(dai.IMUSensor.LINEAR_ACCELERATION, 400)
                 imu_node.enableIMUSensor(dai.IMUSensor.GYROSCOPE_RAW, 400)
                 imu_node.enableIMUSensor(dai.IMUSensor.ROTATION_VECTOR, 100)
-                imu_node.setBatchReportThreshold(1)
-                imu_node.setMaxBatchReports(10)
+                # Batch ~5 reports per message (≈12.5 ms at 400 Hz) so each queue pull carries several packets
+                imu_node.setBatchReportThreshold(5)
+                imu_node.setMaxBatchReports(20)
 
                 imu_queue = imu_node.out.createOutputQueue(maxSize=50, blocking=False)
                 pipeline.start()
@@ -101,11 +118,15 @@ class IMUReader(threading.Thread):
 
                 while pipeline.isRunning():
                     try:
-                        imu_data_pkt = imu_queue.get()
-                        if imu_data_pkt is None:
+                        # Drain everything queued in one call; only the newest packet is published —
+                        # every consumer reads the latest snapshot, so older packets would be
+                        # decoded (compass atan2 + dict build) only to be overwritten immediately
+                        batch = imu_queue.getAll()
+                        if not batch or batch[-1] is None:
                             continue
-                        for pkt in imu_data_pkt.packets:
-                            self._process_packet(pkt)
+                        packets = batch[-1].packets
+                        if packets:
+                            self._process_packet(packets[-1])
                     except Exception as e:
                         logger.error(f"IMUReader: failed to read packet: {e}")
 
@@ -129,18 +150,20 @@ class IMUReader(threading.Thread):
             calibrated = accuracy >= 2
             bearing, cardinal = quaternion_to_compass(w, xi, yj, zk) if calibrated else (0.0, "N")
 
-            with imu_lock:
-                imu_data = {
-                    "accel": {"x": accel.x, "y": accel.y, "z": accel.z},
-                    "gyro":  {"x": gyro.x,  "y": gyro.y,  "z": gyro.z},
-                    "compass": {
-                        "bearing":    bearing,
-                        "cardinal":   cardinal,
-                        "calibrated": calibrated,
-                        "accuracy":   accuracy,
-                        "quat":       {"w": w, "x": xi, "y": yj, "z": zk},
-                    },
-                    "ts": time.time(),
-                }
+            # Build the complete snapshot first, then publish it with one atomic rebind
+            imu_data = {
+                "accel": {"x": accel.x, "y": accel.y, "z": accel.z},
+                "gyro":  {"x": gyro.x,  "y": gyro.y,  "z": gyro.z},
+                "compass": {
+                    "bearing":    bearing,
+                    "cardinal":   cardinal,
+                    "calibrated": calibrated,
+                    "accuracy":   accuracy,
+                    "quat":       {"w": w, "x": xi, "y": yj, "z": zk},
+                },
+                "ts": time.monotonic(),
+            }
+            if self._on_sample is not None:
+                self._on_sample()
         except Exception as e:
             logger.error(f"IMUReader: packet processing error: {e}")
@@ -7,7 +7,8 @@ Architecture:
     ├─ Loops readline() → _dispatch()
     │    ├─ _parse_gga(): lat/lon/alt/fix_quality/num_sats/hdop
     │    └─ _parse_rmc(): speed_knots/track_deg (only when status=="A")
-    └─ get_data() → thread-safe shallow copy snapshot
+    ├─ get_data() → thread-safe shallow copy snapshot
+    └─ on_update() → optional callback, invoked in the reader thread after each GGA/RMC update
 
 Graceful degradation:
   - Serial open failure → is_available=False, thread exits cleanly
@@ -23,6 +24,7 @@ Usage:
 import logging
 import threading
 import time
+from typing import Callable
 
 import serial
 
@@ -34,8 +36,9 @@ logger = logging.getLogger(__name__)
 class RTKReader(threading.Thread):
     """Daemon thread: reads NMEA sentences from Emlid RS+ and updates internal data store."""
 
-    def __init__(self) -> None:
+    def __init__(self, on_update: Callable[[], None] | None = None) -> None:
         super().__init__(name="RTKReader", daemon=True)
+        self._on_update = on_update
         self._lock = threading.Lock()
         self._data: dict = {
             "lat":         None,   # float, decimal degrees (+N/-S)
@@ -115,12 +118,16 @@ class RTKReader(threading.Thread):
         sentence_type = parts[0][2:]  # slice off 2-char talker prefix (GP/GN/GL…)
 
         if sentence_type == "GGA":
-            self._parse_gga(parts)
+            updated = self._parse_gga(parts)
         elif sentence_type == "RMC":
-            self._parse_rmc(parts)
+            updated = self._parse_rmc(parts)
+        else:
+            return
+        if updated and self._on_update is not None:
+            self._on_update()
 
     # ── GGA parser ────────────────────────────────────────
-    def _parse_gga(self, parts: list[str]) -> None:
+    def _parse_gga(self, parts: list[str]) -> bool:
         """
         $GPGGA,HHMMSS.ss,LLLL.LL,a,YYYYY.YY,a,x,xx,x.x,x.x,M,...*hh
         Index:    0        1      2  3        4  5  6   7   8   9
@@ -128,7 +135,7 @@ class RTKReader(threading.Thread):
         try:
             if len(parts) < 10:
                 logger.warning(f"RTKReader: GGA too short: {parts}")
-                return
+                return False
 
             fix_quality = int(parts[6]) if parts[6] else 0
             num_sats    = int(parts[7]) if parts[7] else 0
@@ -147,12 +154,14 @@ class RTKReader(threading.Thread):
                 self._data["hdop"]        = hdop
                 self._data["ts"]          = time.time()
                 self._data["raw_gga"]     = ",".join(parts)
+            return True
 
         except (ValueError, IndexError) as e:
             logger.warning(f"RTKReader: failed to parse GGA: {e} — parts={parts}")
+            return False
 
     # ── RMC parser ────────────────────────────────────────
-    def _parse_rmc(self, parts: list[str]) -> None:
+    def _parse_rmc(self, parts: list[str]) -> bool:
         """
         $GPRMC,HHMMSS.ss,A,LLLL.LL,a,YYYYY.YY,a,x.x,x.x,DDMMYY,...*hh
         Index:    0        1 2       3  4        5  6   7   8
@@ -160,10 +169,10 @@ class RTKReader(threading.Thread):
         """
         try:
             if len(parts) < 9:
-                return
+                return False
             status = parts[2]
             if status != "A":
-                return  # void fix — skip
+                return False  # void fix — skip
 
             speed_knots = float(parts[7]) if parts[7] else None
             track_deg   = float(parts[8]) if parts[8] else None
@@ -171,9 +180,11 @@ class RTKReader(threading.Thread):
             with self._lock:
                 self._data["speed_knots"] = speed_knots
                 self._data["track_deg"]   = track_deg
+            return True
 
         except (ValueError, IndexError) as e:
             logger.warning(f"RTKReader: failed to parse RMC: {e} — parts={parts}")
+            return False
 
     # ── Static helpers ────────────────────────────────────
     @staticmethod
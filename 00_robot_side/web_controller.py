@@ -3,12 +3,18 @@ Web Joystick Controller — HTTP static files + WebSocket + IMU + serial velocit
 
 Architecture:
   Thread-1: asyncio event loop
+    ├─ asyncio.start_server() :WEB_HTTP_PORT → _http_handler() (static files + /config.json, pre-loaded)
     ├─ websockets.serve() :WEB_WS_PORT  → _ws_handler()
     │    receives joystick commands → serial.write("V{linear:.2f},{angular:.2f}\n")
-    ├─ _imu_broadcast_loop(): pushes IMU + compass at 20 Hz
-    └─ _watchdog_loop(): 2 s without heartbeat → sends "V0.00,0.00\n" emergency stop
-  Thread-2: ThreadingHTTPServer :WEB_HTTP_PORT (daemon, serves static files)
-  Thread-3: IMUReader (depthai daemon thread, reads OAK-D IMU)
+    ├─ _broadcast_imu_now(): "telemetry" push, triggered by IMUReader samples (≤ 20 Hz);
+    │    carries the IMU sample plus any rtk / status part staged since the last push
+    ├─ _rtk_broadcast_loop(): stages RTK part, woken by RTKReader updates (1 s idle refresh)
+    ├─ _on_serial_readable(): firmware S:ACTIVE / S:READY lines (add_reader on the serial fd)
+    └─ _watchdog_loop(): 2 s without heartbeat → sends "V0.00,0.00\n" emergency stop;
+         also stops navigation if IMU pushes stall, stages the 2 s status part
+         and drops stalled clients
+  Thread-2: SerialWriter (daemon, drains the serial command queue filled by the loop)
+  Thread-3: IMUReader (depthai daemon thread, reads OAK-D IMU; schedules IMU push on the loop)
 
 Serial port is opened directly via serial.Serial (bypasses SerialWriter whitelist).
 Mutually exclusive with robot_receiver.py / local_controller.py (same serial port).
@@ -19,16 +25,29 @@ Usage:
 """
 
 import asyncio
+import atexit
 import json
 import logging
+import queue
 import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Awaitable, Callable
 
 import serial
 import websockets
 
+try:
+    import orjson  # optional: 2-4x faster JSON decode/encode
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # optional: libuv event loop, faster socket I/O + scheduling
+except ImportError:
+    uvloop = None
+
 from config import (
     FEATHER_PORT, SERIAL_BAUD, SERIAL_TIMEOUT,
     WEB_HTTP_PORT, WEB_WS_PORT,
@@ -38,26 +57,65 @@ from config import (
     DATA_LOG_DIR,
 )
 from sensors.rtk_reader import RTKReader
-from sensors.imu_reader import IMUReader, imu_lock, imu_data, imu_available
+from sensors.imu_reader import IMUReader
 from data_recorder import DataRecorder
 from navigation.nav_engine import NavigationEngine, NavMode, FilterMode
 
 # ── Logging ────────────────────────────────────────────────
+# Records are queued by the event loop / IMU / serial threads and written to
+# file + console by a QueueListener thread, so no hot path ever blocks on disk I/O.
+# The listener starts here together with the QueueHandler (not in main()), so an
+# import without main() (REPL, tools) still gets its records written, not queued forever.
 _py_name = Path(__file__).stem
 Path("log").mkdir(exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(f"log/{_py_name}.log", encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
-)
+_log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+_log_file_handler = logging.FileHandler(f"log/{_py_name}.log", encoding="utf-8")
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(_log_formatter)
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, _log_file_handler, _log_stream_handler)
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+_log_listener.start()
+atexit.register(_log_listener.stop)  # flushes queued records on interpreter exit
 logger = logging.getLogger(__name__)
 
+# ── JSON codec (orjson when installed, stdlib otherwise) ──
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the stdlib type.
+# Encoded payloads are str so they go out as text frames (app.js JSON.parses evt.data).
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 # ── Static files directory ────────────────────────────────
 STATIC_DIR = Path(__file__).parent / "web_static"
 
+# ── IMU push rate cap (IMUReader delivers up to 100 Hz) ───
+IMU_PUSH_INTERVAL: float = 0.05  # 20 Hz
+
+# ── Longest firmware status line kept before the buffer is discarded ──
+SERIAL_LINE_MAX: int = 4096
+
+# ── Pending serial commands before the oldest is dropped (~1.6 s of 10 Hz joystick) ──
+SERIAL_QUEUE_MAX: int = 16
+
+# ── Max wait for the SerialWriter to flush queued commands on shutdown ──
+SERIAL_DRAIN_TIMEOUT: float = 1.0
+
+# ── RTK HUD refresh when no NMEA arrives (availability / offline display) ──
+RTK_IDLE_BROADCAST_INTERVAL: float = 1.0
+
+# ── Slow WebSocket clients ────────────────────────────────
+WS_CLIENT_LAG_BUFFER: int   = 8 * 1024   # unsent bytes above which telemetry frames are skipped
+WS_CLIENT_MAX_BUFFER: int   = 64 * 1024  # unsent bytes at which a client is dropped outright
+WS_CLIENT_STALL_TIMEOUT: float = 5.0     # seconds a client may stay above the lag mark
+
 # ── IMU reader (global, started in main()) ────────────────
 _imu_reader: IMUReader | None = None
 
@@ -73,65 +131,177 @@ _last_linear:  float = 0.0
 _last_angular: float = 0.0
 
 
-# ── HTTP static file server ───────────────────────────────
-class StaticFileHandler(SimpleHTTPRequestHandler):
-    """Serves files from STATIC_DIR; injects MAX_LINEAR/MAX_ANGULAR into index.html."""
+# ── Helpers ───────────────────────────────────────────────
+def _clamp(v: float, lim: float) -> float:
+    """Clamp v to [-lim, lim] with plain comparisons; NaN maps to 0.0 (stop)."""
+    if v > lim:
+        return lim
+    if v < -lim:
+        return -lim
+    return v if v == v else 0.0
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=str(STATIC_DIR), **kwargs)
 
-    def do_GET(self):
-        # Inject velocity config into index.html at request time
-        if self.path in ('/', '/index.html'):
-            self._serve_index()
+# ── HTTP static file server ───────────────────────────────
+# Served by _http_handler() on the asyncio loop (asyncio.start_server), no extra threads.
+# Every response is pre-built once by _load_static_files(): request path → (header, body).
+HTTP_READ_TIMEOUT = 10.0  # seconds to wait for a complete request head before dropping the client
+HTTP_MAX_HEADERS  = 100   # header lines accepted per request
+
+_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js":   "application/javascript; charset=utf-8",
+    ".css":  "text/css; charset=utf-8",
+    ".json": "application/json",
+    ".png":  "image/png",
+    ".svg":  "image/svg+xml",
+    ".ico":  "image/x-icon",
+}
+
+# Velocity limits for the page, fetched once by app.js at load (index.html itself is static)
+_CONFIG_JSON_BYTES: bytes = _json_dumps({
+    "max_linear":  MAX_LINEAR_VEL,
+    "max_angular": MAX_ANGULAR_VEL,
+}).encode("utf-8")
+_static_responses: dict[str, tuple[bytes, bytes]] = {}
+
+
+def _http_head(status: str, content_type: str, length: int, extra: str = "") -> bytes:
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {length}\r\n"
+        f"{extra}"
+        "Connection: close\r\n\r\n"
+    ).encode("latin-1")
+
+
+_RESP_404 = (_http_head("404 Not Found", "text/plain", 9), b"Not Found")
+_RESP_405 = (_http_head("405 Method Not Allowed", "text/plain", 18, "Allow: GET, HEAD\r\n"),
+             b"Method Not Allowed")
+
+
+def _load_index() -> bool:
+    """Read index.html and register it for / and /index.html."""
+    try:
+        body = (STATIC_DIR / "index.html").read_bytes()
+    except OSError as e:
+        logger.error(f"HTTP: failed to load index.html: {e}")
+        return False
+    index = (_http_head("200 OK", _CONTENT_TYPES[".html"], len(body)), body)
+    _static_responses["/"] = index
+    _static_responses["/index.html"] = index
+    return True
+
+
+def _load_static_files() -> None:
+    """Read every file under STATIC_DIR once and pre-build its HTTP response.
+
+    A missing / unreadable index.html is not fatal: the WebSocket side still runs and
+    _http_handler retries reading it from disk on the next request for the page.
+    """
+    _static_responses.clear()
+    for path in STATIC_DIR.rglob("*"):
+        if not path.is_file() or path.name == "index.html":
+            continue
+        body = path.read_bytes()
+        ctype = _CONTENT_TYPES.get(path.suffix.lower(), "application/octet-stream")
+        _static_responses["/" + path.relative_to(STATIC_DIR).as_posix()] = (
+            _http_head("200 OK", ctype, len(body)), body)
+    n_files = len(_static_responses)
+    if _load_index():
+        n_files += 1
+    # Limits come from config / env at startup — never let the browser reuse an older copy
+    _static_responses["/config.json"] = (
+        _http_head("200 OK", _CONTENT_TYPES[".json"], len(_CONFIG_JSON_BYTES),
+                   "Cache-Control: no-store\r\n"),
+        _CONFIG_JSON_BYTES,
+    )
+    logger.info(f"HTTP: {n_files} static files loaded from {STATIC_DIR}")
+
+
+async def _http_handler(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Answer one GET/HEAD request from _static_responses, then close the connection."""
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), HTTP_READ_TIMEOUT)
+        # Drain request headers — nothing in them changes the response
+        for _ in range(HTTP_MAX_HEADERS):
+            line = await asyncio.wait_for(reader.readline(), HTTP_READ_TIMEOUT)
+            if line in (b"\r\n", b"\n", b""):
+                break
+        parts = request_line.split()
+        if len(parts) < 2:
+            return
+        method = parts[0]
+        target = parts[1].split(b"?", 1)[0].decode("latin-1")
+        if method == b"GET" or method == b"HEAD":
+            resp = _static_responses.get(target)
+            if resp is None and target in ("/", "/index.html") and _load_index():
+                resp = _static_responses[target]  # index.html was missing at startup
+            head, body = resp or _RESP_404
         else:
-            super().do_GET()
-
-    def _serve_index(self):
-        index_path = STATIC_DIR / "index.html"
-        try:
-            content = index_path.read_text(encoding="utf-8")
-            # Inject data attributes into <html> tag so JS can read them
-            content = content.replace(
-                '<html lang="en">',
-                f'<html lang="en" data-max-linear="{MAX_LINEAR_VEL}" data-max-angular="{MAX_ANGULAR_VEL}">'
-            )
-            encoded = content.encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(encoded)))
-            self.end_headers()
-            self.wfile.write(encoded)
-        except Exception as e:
-            logger.error(f"HTTP: failed to serve index.html: {e}")
-            self.send_error(500)
-
-    def log_message(self, fmt, *args):
-        logger.debug(f"HTTP: {fmt % args}")
-
-
-def _start_http_server() -> None:
-    """Start ThreadingHTTPServer in a daemon thread."""
-    server = ThreadingHTTPServer(("0.0.0.0", WEB_HTTP_PORT), StaticFileHandler)
-    t = threading.Thread(target=server.serve_forever, name="HTTPServer", daemon=True)
-    t.start()
-    logger.info(f"HTTP server started: http://0.0.0.0:{WEB_HTTP_PORT}/")
+            head, body = _RESP_405
+        writer.write(head if method == b"HEAD" else head + body)
+        await writer.drain()
+        logger.debug(f"HTTP: {method.decode('latin-1')} {target} {head[9:12].decode()}")
+    except (asyncio.TimeoutError, ConnectionError, ValueError):
+        pass  # slow / vanished client or oversized line
+    finally:
+        writer.close()
 
 
 # ── WebSocket server ──────────────────────────────────────
 class WebController:
     """Manages WebSocket connections, serial velocity output, and watchdog."""
 
+    # Pre-encoded fixed messages, indexed by bool (False → 0, True → 1)
+    _STATE_MSGS: tuple[str, str] = (
+        _json_dumps({"type": "state_status", "active": False}),
+        _json_dumps({"type": "state_status", "active": True}),
+    )
+    _RECORD_STOPPED_MSG: str = _json_dumps({"type": "record_status", "recording": False, "filename": ""})
+    # Emergency stop / joystick release / disconnect — the most frequent serial command
+    _STOP_CMD: bytes = b"V0.00,0.00\n"
+
     def __init__(self) -> None:
         self._ser: serial.Serial | None = None
         self._ser_lock = threading.Lock()
+        # Commands for the SerialWriter thread (filled by the event loop / nav engine)
+        self._serial_q: queue.Queue = queue.Queue(maxsize=SERIAL_QUEUE_MAX)
+        self._serial_writer: threading.Thread | None = None
+        # Only touched from the event loop thread (no awaits between read and mutate) → no lock needed
         self._clients: set = set()
-        self._clients_lock = asyncio.Lock()
-        self._last_heartbeat: float = time.time()
+        # Immutable copy of _clients for broadcasts; rebuilt only on connect / disconnect
+        self._clients_snapshot: tuple = ()
+        self._lagging_since: dict = {}  # ws → time it first exceeded WS_CLIENT_LAG_BUFFER
+        self._serial_partial = bytearray()  # incomplete status line (add_reader path)
+        self._last_heartbeat: float = 0.0  # loop.time(); set in serve()
         self._serial_ok = False
-        self._auto_active = False  # tracks current AUTO state (updated by serial reader thread)
+        self._auto_active = False  # tracks current AUTO state (updated by the serial reader)
         self._loop: asyncio.AbstractEventLoop | None = None
         self._nav_engine: NavigationEngine | None = None
+        self._imu_push_pending = False  # set by IMU thread, cleared on the loop
+        self._last_imu_push: float = 0.0
+        self._last_imu_ts: float = -1.0  # IMU sample ts of the last push (change sentinel)
+        # Latest sensor snapshots, published by the IMU push / RTK loop and read lock-free
+        # by the record loop (dict rebinding is atomic; snapshots are never mutated)
+        self._latest_imu: dict = {}
+        self._latest_rtk: dict = {}
+        self._rtk_event = asyncio.Event()  # set (via the loop) by RTKReader on each update
+        # rtk/status parts waiting to ride along with the next IMU push (see _queue_telemetry)
+        self._telemetry_parts: dict = {}
+        self._telemetry_flush: asyncio.TimerHandle | None = None
+        # WebSocket message dispatch: type → handler(msg); async handlers return a coroutine
+        self._msg_handlers: dict[str, Callable[[dict], Awaitable[None] | None]] = {
+            "heartbeat":        self._handle_heartbeat,
+            "joystick":         self._handle_joystick,
+            "toggle_state":     self._handle_toggle_state,
+            "toggle_record":    lambda msg: self._handle_toggle_record(),
+            "upload_waypoints": self._handle_upload_waypoints,
+            "nav_start":        lambda msg: self._handle_nav_start(),
+            "nav_stop":         lambda msg: self._handle_nav_stop(),
+            "nav_mode":         self._handle_nav_mode,
+            "filter_mode":      self._handle_filter_mode,
+        }
 
     # ── Serial ────────────────────────────────────────────
     def open_serial(self) -> None:
@@ -144,95 +314,218 @@ class WebController:
             self._serial_ok = False
 
     def close_serial(self) -> None:
+        """Flush a final stop and any queued commands through the SerialWriter, then close the port."""
+        writer = self._serial_writer
+        if writer is not None and writer.is_alive():
+            self._queue_serial(self._STOP_CMD)
+            try:
+                self._serial_q.put(None, timeout=SERIAL_DRAIN_TIMEOUT)  # sentinel: writer exits after draining
+            except queue.Full:
+                logger.warning("Serial write queue stalled, closing without draining")
+            else:
+                writer.join(timeout=SERIAL_DRAIN_TIMEOUT)
+                if writer.is_alive():
+                    logger.warning("SerialWriter did not finish draining, closing anyway")
         with self._ser_lock:
             if self._ser and self._ser.is_open:
                 self._ser.close()
                 logger.info("Serial port closed")
 
     def _send_velocity(self, linear: float, angular: float) -> None:
-        """Send direct velocity command V{linear:.2f},{angular:.2f}\\n to Feather M4."""
+        """Queue direct velocity command V{linear:.2f},{angular:.2f}\\n for Feather M4."""
         global _last_linear, _last_angular
-        cmd = f"V{linear:.2f},{angular:.2f}\n".encode()
-        with self._ser_lock:
-            if self._ser is None or not self._ser.is_open:
-                logger.warning("Serial port not open, cannot send velocity command")
-                return
-            try:
-                self._ser.write(cmd)
-                logger.debug(f"Serial write: {cmd!r}")
-            except serial.SerialException as e:
-                logger.error(f"Serial write failed: {e}")
-                self._serial_ok = False
-                return
-        # Update last command after successful write
+        if linear == 0.0 and angular == 0.0:
+            cmd = self._STOP_CMD
+        else:
+            cmd = b"V%.2f,%.2f\n" % (linear, angular)  # bytes %-format: no str + encode() round-trip
+        if not self._queue_serial(cmd):
+            return
         with _vel_lock:
             _last_linear  = linear
             _last_angular = angular
 
     def _send_raw(self, data: bytes) -> None:
-        """Send raw bytes directly to serial port (e.g. state toggle '\\r')."""
-        with self._ser_lock:
-            if self._ser is None or not self._ser.is_open:
-                logger.warning("Serial port not open, cannot send raw command")
-                return
+        """Queue raw bytes for the serial port (e.g. state toggle '\\r')."""
+        self._queue_serial(data)
+
+    def _queue_serial(self, cmd: bytes) -> bool:
+        """Hand cmd to the SerialWriter thread without blocking the caller (event loop).
+
+        If the port has stalled long enough to fill the queue, the oldest command is
+        dropped — a newer velocity command supersedes it anyway.
+        """
+        if self._ser is None or not self._ser.is_open:
+            logger.warning(f"Serial port not open, cannot send {cmd!r}")
+            return False
+        try:
+            self._serial_q.put_nowait(cmd)
+        except queue.Full:
             try:
-                self._ser.write(data)
-                logger.debug(f"Serial write (raw): {data!r}")
-            except serial.SerialException as e:
-                logger.error(f"Serial raw write failed: {e}")
-                self._serial_ok = False
+                dropped = self._serial_q.get_nowait()
+                logger.warning(f"Serial write queue full, dropping {dropped!r}")
+            except queue.Empty:
+                pass
+            try:
+                self._serial_q.put_nowait(cmd)
+            except queue.Full:  # another producer refilled the slot in between
+                logger.warning(f"Serial write queue full, dropping {cmd!r}")
+                return False
+        return True
+
+    def _start_serial_writer(self) -> None:
+        t = threading.Thread(target=self._serial_writer_thread, name="SerialWriter", daemon=True)
+        self._serial_writer = t
+        t.start()
+        logger.info("SerialWriter thread started")
+
+    def _serial_writer_thread(self) -> None:
+        """Writes queued commands to the serial port, so a slow USB write never stalls the loop.
+
+        Every command is written, repeats included: the firmware zeroes its velocity whenever
+        the VCU leaves AUTO_ACTIVE, so a held joystick / steady nav command must keep arriving
+        to take effect again. Exits on the None sentinel queued by close_serial().
+        """
+        while True:
+            cmd = self._serial_q.get()
+            if cmd is None:
+                break
+            with self._ser_lock:
+                ser = self._ser
+                if ser is None or not ser.is_open:
+                    continue
+                try:
+                    ser.write(cmd)
+                except serial.SerialException as e:
+                    logger.error(f"Serial write failed: {e}")
+                    self._serial_ok = False
+                    continue
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Serial write: {cmd!r}")
 
     # ── Broadcast helper ──────────────────────────────────
-    async def _broadcast(self, obj: dict) -> None:
-        """Broadcast a JSON message to all connected clients."""
-        msg = json.dumps(obj)
-        async with self._clients_lock:
-            clients = set(self._clients)
-        dead = set()
-        for ws in clients:
-            try:
-                await ws.send(msg)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._clients_lock:
-                self._clients -= dead
-
-    # ── Serial reader thread ───────────────────────────────
+    def _broadcast(self, obj: dict) -> None:
+        """Encode obj once and broadcast it to all connected clients (event loop thread only)."""
+        self._broadcast_payload(_json_dumps(obj))
+
+    def _broadcast_payload(self, payload: str) -> None:
+        """Broadcast an already-encoded JSON message (event loop thread only).
+
+        websockets.broadcast() writes the same frame into each client's buffer without
+        awaiting and skips closed connections; _ws_handler removes them on exit.
+        """
+        websockets.broadcast(self._clients_snapshot, payload)
+
+    def _drop_slow_clients(self) -> None:
+        """Abort clients whose socket has stopped draining (event loop thread only).
+
+        broadcast() never waits on a client, so a stuck phone can't delay the others —
+        but its unsent frames pile up in the transport buffer (telemetry pauses at
+        WS_CLIENT_LAG_BUFFER, event messages keep coming). A client is aborted once it has
+        stayed above that mark for WS_CLIENT_STALL_TIMEOUT or reaches WS_CLIENT_MAX_BUFFER;
+        aborting the transport ends its _ws_handler, which discards it from _clients.
+        """
+        now = self._loop.time()
+        lagging: dict = {}
+        for ws in self._clients_snapshot:
+            transport = ws.transport
+            if transport is None:
+                continue
+            buffered = transport.get_write_buffer_size()
+            if buffered <= WS_CLIENT_LAG_BUFFER:
+                continue
+            since = self._lagging_since.get(ws, now)
+            if buffered > WS_CLIENT_MAX_BUFFER or now - since > WS_CLIENT_STALL_TIMEOUT:
+                logger.warning(f"WebSocket: dropping stalled client {ws.remote_address} "
+                               f"({buffered} bytes unsent for {now - since:.1f}s)")
+                transport.abort()
+                continue
+            lagging[ws] = since
+        self._lagging_since = lagging
+
+    # ── Serial reader (event loop fd watch, thread fallback) ──
     def _start_serial_reader(self) -> None:
-        """Start daemon thread that reads status lines from Feather M4."""
+        """Start reading status lines from Feather M4.
+
+        POSIX: the port's fd is registered with the event loop (add_reader), so the loop is
+        woken only when bytes arrive and no reader thread is needed. Ports without a
+        fileno() (Windows) or loops without add_reader fall back to a daemon thread.
+        """
+        ser = self._ser
+        if ser is not None and ser.is_open and hasattr(ser, "fileno"):
+            try:
+                self._loop.add_reader(ser.fileno(), self._on_serial_readable)
+                logger.info("SerialReader: watching serial port on the event loop")
+                return
+            except (NotImplementedError, OSError, ValueError) as e:
+                logger.info(f"SerialReader: add_reader unavailable ({e!r}), using a thread")
         t = threading.Thread(target=self._serial_reader_thread, name="SerialReader", daemon=True)
         t.start()
         logger.info("SerialReader thread started")
 
+    def _on_serial_readable(self) -> None:
+        """add_reader callback (event loop): read what is buffered and handle complete lines."""
+        ser = self._ser
+        try:
+            chunk = ser.read(ser.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            # Typically the USB device went away: readable but no data → stop watching the fd
+            logger.error(f"SerialReader: read error: {e}")
+            self._loop.remove_reader(ser.fileno())
+            self._serial_ok = False
+            return
+        buf = self._serial_partial
+        buf += chunk
+        while True:
+            nl = buf.find(b"\n")
+            if nl < 0:
+                break
+            line = bytes(buf[:nl])
+            del buf[:nl + 1]
+            self._handle_serial_line(line.strip())
+        if len(buf) > SERIAL_LINE_MAX:
+            logger.warning(f"SerialReader: no newline in {len(buf)} bytes, discarding buffer")
+            buf.clear()
+
     def _serial_reader_thread(self) -> None:
-        """Reads serial output from Feather M4; parses S:ACTIVE / S:READY lines."""
-        buf = b""
+        """Reads serial output from Feather M4; parses S:ACTIVE / S:READY lines.
+
+        Blocks in read_until() (bounded by SERIAL_TIMEOUT) so the thread wakes as soon as a
+        line arrives. _ser_lock is not held while reading; pyserial allows a concurrent
+        write from another thread, so velocity commands are never delayed by the reader.
+        """
+        partial = bytearray()  # bytes of a line split across a read timeout (in-place growth)
         while True:
+            ser = self._ser
+            if ser is None or not ser.is_open:
+                partial.clear()
+                time.sleep(0.1)
+                continue
             try:
-                with self._ser_lock:
-                    if self._ser is None or not self._ser.is_open:
-                        buf = b""
-                        time.sleep(0.1)
-                        continue
-                    n = self._ser.in_waiting
-                    chunk = self._ser.read(n) if n > 0 else b""
+                chunk = ser.read_until(b"\n", SERIAL_LINE_MAX)
             except serial.SerialException as e:
                 logger.error(f"SerialReader: read error: {e}")
-                buf = b""
+                partial.clear()
                 time.sleep(0.1)
                 continue
 
-            if chunk:
-                buf += chunk
-                while b"\n" in buf:
-                    line, buf = buf.split(b"\n", 1)
-                    self._handle_serial_line(line.strip())
+            if not chunk.endswith(b"\n"):
+                partial += chunk  # timeout mid-line (or nothing at all) — keep waiting
+                if len(partial) > SERIAL_LINE_MAX:
+                    logger.warning(f"SerialReader: no newline in {len(partial)} bytes, discarding buffer")
+                    partial.clear()
+                continue
+            if partial:
+                partial += chunk
+                line = bytes(partial)
+                partial.clear()
             else:
-                time.sleep(0.01)
+                line = chunk
+            line = line.strip()
+            if line == b"S:ACTIVE" or line == b"S:READY":  # only state reports need the loop
+                self._loop.call_soon_threadsafe(self._handle_serial_line, line)
 
     def _handle_serial_line(self, line: bytes) -> None:
-        """Process a status line received from Feather M4."""
+        """Process a status line received from Feather M4 (event loop thread only)."""
         if line == b"S:ACTIVE":
             new_state = True
         elif line == b"S:READY":
@@ -243,88 +536,68 @@ class WebController:
             return  # state unchanged, skip broadcast
         self._auto_active = new_state
         logger.info(f"SerialReader: firmware state -> {'ACTIVE' if new_state else 'READY'}")
-        if self._loop is not None:
-            asyncio.run_coroutine_threadsafe(
-                self._broadcast({"type": "state_status", "active": new_state}),
-                self._loop,
-            )
+        self._broadcast_payload(self._STATE_MSGS[new_state])
 
     # ── WebSocket handler ─────────────────────────────────
     async def _ws_handler(self, websocket) -> None:
-        async with self._clients_lock:
-            self._clients.add(websocket)
+        self._clients.add(websocket)
+        self._clients_snapshot = tuple(self._clients)
         logger.info(f"WebSocket client connected: {websocket.remote_address}")
         # Push current AUTO state to new client so page refresh does not cause stale UI
         try:
-            await websocket.send(json.dumps({"type": "state_status", "active": self._auto_active}))
+            await websocket.send(self._STATE_MSGS[self._auto_active])
         except Exception as e:
             logger.warning(f"WebSocket: failed to send initial state_status: {e}")
+        handlers = self._msg_handlers
         try:
             async for raw in websocket:
                 try:
-                    msg = json.loads(raw)
+                    msg = _json_loads(raw)
                 except json.JSONDecodeError:
                     logger.warning(f"WebSocket: invalid JSON: {raw!r}")
                     continue
 
-                msg_type = msg.get("type")
-
-                if msg_type == "heartbeat":
-                    self._last_heartbeat = time.time()
-
-                elif msg_type == "joystick":
-                    self._last_heartbeat = time.time()  # joystick messages also reset watchdog
-                    # 自动导航中忽略摇杆
-                    nav_active = (
-                        self._nav_engine is not None
-                        and self._nav_engine.get_status().get("state") == "navigating"
-                    )
-                    if not nav_active:
-                        try:
-                            linear  = float(msg.get("linear",  0.0))
-                            angular = float(msg.get("angular", 0.0))
-                            # Clamp to configured velocity limits
-                            linear  = max(-MAX_LINEAR_VEL,  min(MAX_LINEAR_VEL,  linear))
-                            angular = max(-MAX_ANGULAR_VEL, min(MAX_ANGULAR_VEL, angular))
-                            self._send_velocity(linear, angular)
-                        except (TypeError, ValueError) as e:
-                            logger.warning(f"WebSocket: malformed joystick message: {e}")
-
-                elif msg_type == "toggle_state":
-                    self._last_heartbeat = time.time()
-                    self._send_raw(b"\r")
-                    # _auto_active is updated by the serial reader thread from firmware reply, not here
-                    logger.info("WebSocket: state toggle command sent (\\r), awaiting firmware confirmation")
-
-                elif msg_type == "toggle_record":
-                    await self._handle_toggle_record()
-
-                elif msg_type == "upload_waypoints":
-                    await self._handle_upload_waypoints(msg)
-
-                elif msg_type == "nav_start":
-                    await self._handle_nav_start()
-
-                elif msg_type == "nav_stop":
-                    await self._handle_nav_stop()
-
-                elif msg_type == "nav_mode":
-                    await self._handle_nav_mode(msg)
-
-                elif msg_type == "filter_mode":
-                    await self._handle_filter_mode(msg)
+                # Any well-formed message proves the client is alive → reset watchdog
+                self._last_heartbeat = self._loop.time()
+
+                handler = handlers.get(msg.get("type"))
+                if handler is not None:
+                    result = handler(msg)
+                    if result is not None:  # async handlers return a coroutine
+                        await result
 
         except websockets.exceptions.ConnectionClosedError:
             pass
         except Exception as e:
             logger.error(f"WebSocket handler error: {e}")
         finally:
-            async with self._clients_lock:
-                self._clients.discard(websocket)
+            self._clients.discard(websocket)
+            self._clients_snapshot = tuple(self._clients)
             logger.info(f"WebSocket client disconnected: {websocket.remote_address}")
             # Send emergency stop immediately on disconnect
             self._send_velocity(0.0, 0.0)
 
+    # ── Lightweight message handlers (sync) ───────────────
+    def _handle_heartbeat(self, msg: dict) -> None:
+        """Heartbeat only resets the watchdog, which _ws_handler already did."""
+
+    def _handle_joystick(self, msg: dict) -> None:
+        # 自动导航中忽略摇杆
+        if self._nav_engine is not None and self._nav_engine.is_navigating:
+            return
+        try:
+            linear  = float(msg.get("linear",  0.0))
+            angular = float(msg.get("angular", 0.0))
+            # Clamp to configured velocity limits
+            self._send_velocity(_clamp(linear, MAX_LINEAR_VEL), _clamp(angular, MAX_ANGULAR_VEL))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"WebSocket: malformed joystick message: {e}")
+
+    def _handle_toggle_state(self, msg: dict) -> None:
+        self._send_raw(b"\r")
+        # _auto_active is updated by the serial reader from firmware reply, not here
+        logger.info("WebSocket: state toggle command sent (\\r), awaiting firmware confirmation")
+
     # ── Toggle record handler ─────────────────────────────
     async def _handle_toggle_record(self) -> None:
         """Start or stop CSV recording and broadcast status to all clients."""
@@ -332,35 +605,20 @@ class WebController:
             return
         if _data_recorder.is_recording:
             _data_recorder.stop()
-            msg = json.dumps({
-                "type": "record_status",
-                "recording": False,
-                "filename": "",
-            })
             logger.info("DataRecorder: stopped via WebSocket toggle")
-        else:
-            try:
-                filename = _data_recorder.start()
-                msg = json.dumps({
-                    "type": "record_status",
-                    "recording": True,
-                    "filename": filename,
-                })
-                logger.info(f"DataRecorder: started via WebSocket toggle → {filename}")
-            except OSError:
-                msg = json.dumps({
-                    "type": "record_status",
-                    "recording": False,
-                    "filename": "",
-                })
-
-        async with self._clients_lock:
-            clients = set(self._clients)
-        for ws in clients:
-            try:
-                await ws.send(msg)
-            except Exception:
-                pass
+            self._broadcast_payload(self._RECORD_STOPPED_MSG)
+            return
+        try:
+            filename = _data_recorder.start()
+        except OSError:
+            self._broadcast_payload(self._RECORD_STOPPED_MSG)
+            return
+        logger.info(f"DataRecorder: started via WebSocket toggle → {filename}")
+        self._broadcast({
+            "type": "record_status",
+            "recording": True,
+            "filename": filename,
+        })
 
     # ── Navigation handlers ───────────────────────────────
     async def _handle_upload_waypoints(self, msg: dict) -> None:
@@ -370,15 +628,15 @@ class WebController:
         csv_text = msg.get("csv", "")
         if not isinstance(csv_text, str) or not csv_text.strip():
             logger.warning("WebSocket: upload_waypoints: CSV 为空")
-            await self._broadcast({"type": "waypoints_loaded", "count": 0, "error": "empty CSV"})
+            self._broadcast({"type": "waypoints_loaded", "count": 0, "error": "empty CSV"})
             return
         try:
             count = self._nav_engine.load_waypoints(csv_text)
-            await self._broadcast({"type": "waypoints_loaded", "count": count})
+            self._broadcast({"type": "waypoints_loaded", "count": count})
             logger.info(f"WebSocket: 航点已加载，共 {count} 个")
         except Exception as e:
             logger.error(f"WebSocket: 航点加载失败: {e}")
-            await self._broadcast({"type": "waypoints_loaded", "count": 0, "error": str(e)})
+            self._broadcast({"type": "waypoints_loaded", "count": 0, "error": str(e)})
 
     async def _handle_nav_start(self) -> None:
         """处理导航开始指令。"""
@@ -387,20 +645,20 @@ class WebController:
         ok = self._nav_engine.start()
         if not ok:
             status = self._nav_engine.get_status()
-            await self._broadcast({
+            self._broadcast({
                 "type":  "nav_status",
                 "error": "无法启动导航（无航点或 GPS 信号不足）",
                 **status,
             })
         else:
-            await self._broadcast(self._nav_engine.get_status())
+            self._broadcast(self._nav_engine.get_status())
 
     async def _handle_nav_stop(self) -> None:
         """处理导航停止指令。"""
         if self._nav_engine is None:
             return
         self._nav_engine.stop()
-        await self._broadcast(self._nav_engine.get_status())
+        self._broadcast(self._nav_engine.get_status())
 
     async def _handle_nav_mode(self, msg: dict) -> None:
         """切换导航算法模式（p2p / pure_pursuit）。"""
@@ -410,7 +668,7 @@ class WebController:
         try:
             mode = NavMode(mode_str)
             self._nav_engine.set_nav_mode(mode)
-            await self._broadcast(self._nav_engine.get_status())
+            self._broadcast(self._nav_engine.get_status())
         except ValueError:
             logger.warning(f"WebSocket: 未知导航模式: {mode_str!r}")
 
@@ -422,65 +680,130 @@ class WebController:
         try:
             mode = FilterMode(mode_str)
             self._nav_engine.set_filter_mode(mode)
-            await self._broadcast(self._nav_engine.get_status())
+            self._broadcast(self._nav_engine.get_status())
         except ValueError:
             logger.warning(f"WebSocket: 未知滤波器模式: {mode_str!r}")
 
-    # ── IMU broadcast loop (20 Hz) ────────────────────────
-    async def _imu_broadcast_loop(self) -> None:
-        while True:
-            await asyncio.sleep(0.05)  # 20 Hz
-            if _imu_reader is None:
-                continue
-            data = _imu_reader.get_data()
-            msg = json.dumps({
-                "type": "imu",
-                "ts":    data.get("ts"),
-                "accel": data.get("accel"),
-                "gyro":  data.get("gyro"),
-                "compass": data.get("compass"),
-            })
-            async with self._clients_lock:
-                clients = set(self._clients)
-            if clients:
-                dead = set()
-                for ws in clients:
-                    try:
-                        await ws.send(msg)
-                    except Exception:
-                        dead.add(ws)
-                if dead:
-                    async with self._clients_lock:
-                        self._clients -= dead
-            # 导航引擎 IMU 回调（20 Hz 驱动控制循环）
-            if self._nav_engine is not None:
-                self._nav_engine.on_imu(data)
+    # ── IMU push (event-driven, ≤ 20 Hz) ──────────────────
+    def notify_imu_sample(self) -> None:
+        """IMUReader on_sample callback (IMU thread): schedule one push on the event loop."""
+        if self._loop is None or self._imu_push_pending:
+            return
+        self._imu_push_pending = True
+        self._loop.call_soon_threadsafe(self._broadcast_imu_now)
+
+    def _broadcast_imu_now(self) -> None:
+        """Push the latest IMU sample to all clients and the nav engine (runs on the loop)."""
+        if _imu_reader is None:
+            self._imu_push_pending = False
+            return
+        now = self._loop.time()
+        wait = IMU_PUSH_INTERVAL - (now - self._last_imu_push)
+        if wait > 0:
+            # Rate cap: push whatever sample is newest when the interval ends. The pending flag
+            # stays set, so the IMU thread stops scheduling wakeups until then.
+            self._loop.call_later(wait, self._broadcast_imu_now)
+            return
+        self._imu_push_pending = False
+        data = _imu_reader.get_data()
+        ts = data.get("ts")
+        if ts == self._last_imu_ts:
+            return  # no new sample since the last push — nothing to encode or send
+        self._last_imu_push = now
+        self._last_imu_ts = ts
+        self._latest_imu = data
+        self._flush_telemetry(data)  # snapshot is already {ts, accel, gyro, compass}, read-only
+        # 导航引擎 IMU 回调（20 Hz 驱动控制循环）
+        if self._nav_engine is not None:
+            self._nav_engine.on_imu(data)
+
+    # ── Telemetry frame (imu + rtk + status merged) ───────
+    def _queue_telemetry(self, key: str, part: dict) -> None:
+        """Stage an rtk/status part for the next telemetry frame (runs on the loop).
+
+        The part normally rides along with the next IMU push; if no IMU sample arrives
+        within IMU_PUSH_INTERVAL (IMU absent / stalled) it is flushed on its own.
+        """
+        self._telemetry_parts[key] = part
+        if self._telemetry_flush is None:
+            self._telemetry_flush = self._loop.call_later(IMU_PUSH_INTERVAL, self._flush_telemetry)
+
+    def _flush_telemetry(self, imu: dict | None = None) -> None:
+        """Broadcast one telemetry frame with the IMU sample and any staged parts."""
+        if self._telemetry_flush is not None:
+            self._telemetry_flush.cancel()
+            self._telemetry_flush = None
+        frame = self._telemetry_parts
+        if imu is not None:
+            frame["imu"] = imu
+        if not frame:
+            return
+        self._telemetry_parts = {}
+        frame["type"] = "telemetry"
+        # Telemetry is latest-wins: a client still draining earlier frames skips this one
+        # instead of queueing a backlog of stale samples (event messages always go to everyone)
+        ready = [ws for ws in self._clients_snapshot
+                 if ws.transport is None or ws.transport.get_write_buffer_size() <= WS_CLIENT_LAG_BUFFER]
+        websockets.broadcast(ready, _json_dumps(frame))
 
     # ── Watchdog loop ─────────────────────────────────────
     async def _watchdog_loop(self) -> None:
+        """0.5 s tick: heartbeat watchdog + slow-client sweep; every 4th tick (2 s) the status part."""
+        tick = 0
         while True:
             await asyncio.sleep(0.5)
-            elapsed = time.time() - self._last_heartbeat
+            tick += 1
+            if tick & 3 == 0:
+                self._queue_status()
+            self._drop_slow_clients()
+            # The nav control step (incl. its GPS-timeout stop) is driven by IMU pushes;
+            # this timer-driven check stops navigation if those pushes dry up
+            if self._nav_engine is not None:
+                self._nav_engine.check_imu_timeout()
+            elapsed = self._loop.time() - self._last_heartbeat
             if elapsed > WATCHDOG_TIMEOUT:
                 logger.warning(f"Watchdog triggered! No heartbeat for {elapsed:.1f}s — sending emergency stop")
                 self._send_velocity(0.0, 0.0)
                 # On watchdog trigger, send \r to flip firmware back to READY;
-                # _auto_active is updated by the serial reader thread once firmware replies S:READY
+                # _auto_active is updated by the serial reader once firmware replies S:READY
                 if self._auto_active:
                     self._send_raw(b"\r")  # firmware replies S:READY; serial reader handles state + broadcast
                     logger.info("Watchdog: sent \\r to reset AUTO state, awaiting firmware confirmation")
                 # Reset timer to avoid flooding logs with repeated stop commands
-                self._last_heartbeat = time.time()
+                self._last_heartbeat = self._loop.time()
+
+    def _queue_status(self) -> None:
+        """Stage the system-health part for the next telemetry frame."""
+        rtk_ok    = _rtk_reader.is_available if _rtk_reader is not None else False
+        imu_ok    = _imu_reader.is_available if _imu_reader is not None else False
+        recording = _data_recorder.is_recording if _data_recorder is not None else False
+        self._queue_telemetry("status", {
+            "serial_ok":  self._serial_ok,
+            "imu_ok":     imu_ok,
+            "rtk_ok":     rtk_ok,
+            "recording":  recording,
+            "message":    "OK" if (self._serial_ok and imu_ok) else "DEGRADED",
+        })
+
+    # ── RTK broadcast loop (event-driven) ─────────────────
+    def notify_rtk_update(self) -> None:
+        """RTKReader on_update callback (RTK thread): wake _rtk_broadcast_loop."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._rtk_event.set)
 
-    # ── RTK broadcast loop (1 Hz) ─────────────────────────
     async def _rtk_broadcast_loop(self) -> None:
+        if _rtk_reader is None:
+            return  # RTK disabled
         while True:
-            await asyncio.sleep(1.0)  # 1 Hz — GPS updates ~1 Hz
-            if _rtk_reader is None:
-                continue
+            fresh = True
+            try:
+                await asyncio.wait_for(self._rtk_event.wait(), timeout=RTK_IDLE_BROADCAST_INTERVAL)
+            except asyncio.TimeoutError:
+                fresh = False  # no new sentence — still refresh availability on the HUD
+            self._rtk_event.clear()
             snap = _rtk_reader.get_data()
-            msg = json.dumps({
-                "type":        "rtk",
+            self._latest_rtk = snap
+            self._queue_telemetry("rtk", {
                 "available":   _rtk_reader.is_available,
                 "lat":         snap["lat"],
                 "lon":         snap["lon"],
@@ -491,20 +814,8 @@ class WebController:
                 "speed_knots": snap["speed_knots"],
                 "track_deg":   snap["track_deg"],
             })
-            async with self._clients_lock:
-                clients = set(self._clients)
-            if clients:
-                dead = set()
-                for ws in clients:
-                    try:
-                        await ws.send(msg)
-                    except Exception:
-                        dead.add(ws)
-                if dead:
-                    async with self._clients_lock:
-                        self._clients -= dead
-            # 导航引擎 RTK 回调（1 Hz 更新 GPS 滤波器）
-            if self._nav_engine is not None:
+            # 导航引擎 RTK 回调（仅新数据；重复喂旧快照会掩盖 GPS 超时）
+            if fresh and self._nav_engine is not None:
                 self._nav_engine.on_rtk(snap)
 
     # ── Data record loop (5 Hz) ───────────────────────────
@@ -513,41 +824,19 @@ class WebController:
             await asyncio.sleep(0.2)  # 5 Hz
             if _data_recorder is None or not _data_recorder.is_recording:
                 continue
-            imu_snap = _imu_reader.get_data() if _imu_reader is not None else {}
-            rtk_snap = _rtk_reader.get_data() if _rtk_reader is not None else {}
+            imu_snap = self._latest_imu
+            rtk_snap = self._latest_rtk
             with _vel_lock:
                 linear  = _last_linear
                 angular = _last_angular
             _data_recorder.record(imu_snap, rtk_snap, linear, angular)
 
-    # ── Status broadcast loop (low frequency) ─────────────
-    async def _status_broadcast_loop(self) -> None:
-        while True:
-            await asyncio.sleep(2.0)
-            rtk_ok    = _rtk_reader.is_available if _rtk_reader is not None else False
-            imu_ok    = _imu_reader.is_available if _imu_reader is not None else False
-            recording = _data_recorder.is_recording if _data_recorder is not None else False
-            msg = json.dumps({
-                "type":       "status",
-                "serial_ok":  self._serial_ok,
-                "imu_ok":     imu_ok,
-                "rtk_ok":     rtk_ok,
-                "recording":  recording,
-                "message":    "OK" if (self._serial_ok and imu_ok) else "DEGRADED",
-            })
-            async with self._clients_lock:
-                clients = set(self._clients)
-            for ws in clients:
-                try:
-                    await ws.send(msg)
-                except Exception:
-                    pass
-
     # ── Main entry ────────────────────────────────────────
     async def serve(self) -> None:
         self._loop = asyncio.get_running_loop()
-        self._last_heartbeat = time.time()
-        self._start_serial_reader()  # start daemon thread to read firmware state reports
+        self._last_heartbeat = self._loop.time()
+        self._start_serial_writer()  # serial writes happen off the event loop
+        self._start_serial_reader()  # watch serial port for firmware state reports
 
         # 初始化导航引擎
         self._nav_engine = NavigationEngine(
@@ -557,18 +846,22 @@ class WebController:
         )
         logger.info("NavigationEngine initialized")
 
-        async with websockets.serve(
+        http_server = await asyncio.start_server(_http_handler, "0.0.0.0", WEB_HTTP_PORT)
+        logger.info(f"HTTP server started: http://0.0.0.0:{WEB_HTTP_PORT}/")
+
+        async with http_server, websockets.serve(
             self._ws_handler,
             "0.0.0.0",
             WEB_WS_PORT,
             ping_interval=20,
             ping_timeout=10,
+            # Small high-rate float JSON compresses poorly; per-connection
+            # permessage-deflate would re-compress every broadcast once per client.
+            compression=None,
         ):
             logger.info(f"WebSocket server started: ws://0.0.0.0:{WEB_WS_PORT}/")
             await asyncio.gather(
-                self._imu_broadcast_loop(),
                 self._watchdog_loop(),
-                self._status_broadcast_loop(),
                 self._rtk_broadcast_loop(),
                 self._data_record_loop(),
             )
@@ -592,16 +885,16 @@ def main() -> None:
     controller = WebController()
     controller.open_serial()
 
-    # Start HTTP static file server (daemon thread)
-    _start_http_server()
+    # Pre-load static files for the HTTP server (served from the asyncio loop in serve())
+    _load_static_files()
 
     # Start IMU reader thread (daemon thread)
-    _imu_reader = IMUReader()
+    _imu_reader = IMUReader(on_sample=controller.notify_imu_sample)
     _imu_reader.start()
 
     # Start RTK reader thread (daemon thread)
     if RTK_ENABLED:
-        _rtk_reader = RTKReader()
+        _rtk_reader = RTKReader(on_update=controller.notify_rtk_update)
         _rtk_reader.start()
         logger.info(f"RTKReader started: {RTK_PORT} @ {RTK_BAUD} baud")
     else:
@@ -611,18 +904,26 @@ def main() -> None:
     _data_recorder = DataRecorder(DATA_LOG_DIR)
     logger.info(f"DataRecorder initialized: log_dir={DATA_LOG_DIR}")
 
-    # Resolve local IP for user-facing access hint
+    # Resolve local IP for user-facing access hint: connect() on a UDP socket only picks the
+    # outbound interface via the routing table — no packet is sent and no DNS lookup is made
+    import socket
+    local_ip = "localhost"
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
-        import socket
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-    except Exception:
-        local_ip = "localhost"
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+    except OSError:
+        pass  # no route (offline) — keep localhost
+    finally:
+        s.close()
 
     logger.info(f"Open on phone: http://{local_ip}:{WEB_HTTP_PORT}/")
 
     try:
-        asyncio.run(controller.serve())
+        if uvloop is not None:
+            uvloop.run(controller.serve())
+        else:
+            asyncio.run(controller.serve())
     except KeyboardInterrupt:
         logger.info("Interrupted by user, shutting down...")
     finally:
@@ -7,9 +7,20 @@ const HEARTBEAT_INTERVAL_MS = 500;
 const JOYSTICK_SEND_INTERVAL_MS = 100;  // 10Hz throttle
 const DEADZONE = 0.15;
 
-// MAX_LINEAR_VEL / MAX_ANGULAR_VEL injected by server as data attributes or fallback 1.0
-const MAX_LINEAR  = parseFloat(document.documentElement.dataset.maxLinear  || "1.0");
-const MAX_ANGULAR = parseFloat(document.documentElement.dataset.maxAngular || "1.0");
+// MAX_LINEAR_VEL / MAX_ANGULAR_VEL from the server's /config.json (fallback 1.0 until loaded;
+// the server clamps to its own limits either way)
+let MAX_LINEAR  = 1.0;
+let MAX_ANGULAR = 1.0;
+
+function loadConfig() {
+  fetch('/config.json')
+    .then((r) => r.json())
+    .then((cfg) => {
+      MAX_LINEAR  = parseFloat(cfg.max_linear)  || 1.0;
+      MAX_ANGULAR = parseFloat(cfg.max_angular) || 1.0;
+    })
+    .catch(() => {});
+}
 
 // ── Speed ratio (Frontend Scaling Default 50) ─────────────────────────
 let speedRatio = 0.5;
@@ -72,6 +83,7 @@ function connect() {
     try {
       const msg = JSON.parse(evt.data);
       const handlers = {
+        telemetry:        handleTelemetry,
         imu:              handleIMU,
         status:           handleStatus,
         rtk:              handleRTK,
@@ -129,6 +141,14 @@ function setStatus(online) {
   }
 }
 
+// ── Telemetry (imu + rtk + status in one frame) ─────────────
+// { type: "telemetry", imu?, rtk?, status? } — each part is optional
+function handleTelemetry(msg) {
+  if (msg.imu)    handleIMU(msg.imu);
+  if (msg.rtk)    handleRTK(msg.rtk);
+  if (msg.status) handleStatus(msg.status);
+}
+
 // ── IMU HUD update ──────────────────────────────────────────
 function fmt3(v) { return (v >= 0 ? '+' : '') + v.toFixed(3); }
 function fmt2(v) { return (v >= 0 ? '+' : '') + v.toFixed(2); }
@@ -410,6 +430,7 @@ window.addEventListener('load', () => {
   autoBtn.addEventListener('click', toggleNav);
   autoBtn.addEventListener('touchend', (e) => { e.preventDefault(); toggleNav(); });
 
-  // Start WebSocket
+  // Load velocity limits, start WebSocket
+  loadConfig();
   connect();
 });
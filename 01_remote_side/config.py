@@ -31,4 +31,6 @@ KEY_REPEAT_INTERVAL: float = float(os.environ.get("KEY_REPEAT_INTERVAL", "0.1"))
 # ── Reconnection ────────────────────────────────────────────────────────────
 TCP_RECONNECT_DELAY: float = float(os.environ.get("TCP_RECONNECT_DELAY", "2.0"))
 STREAM_RECONNECT_DELAY: float = float(os.environ.get("STREAM_RECONNECT_DELAY", "3.0"))
+# Upper bound for the viewer's exponential reconnect backoff
+STREAM_RECONNECT_MAX_DELAY: float = float(os.environ.get("STREAM_RECONNECT_MAX_DELAY", "30.0"))
 STREAM_STALE_TIMEOUT: float = float(os.environ.get("STREAM_STALE_TIMEOUT", "3.0"))
@@ -13,7 +13,7 @@ What runs:
     - Background daemon thread: RemoteSender
         → pynput keyboard → TCP:9000 → robot_receiver.py → serial → Feather M4
     - Main thread:        RemoteViewer
-        → cv2.VideoCapture MJPEG → http://robot:8080 → cv2.imshow
+        → http://robot:8080 → urllib MJPEG part reader → decode thread (cv2.imdecode) → cv2.imshow
 
 Controls (keyboard focus must be on the terminal or active window):
     w / s / a / d  - move
@@ -16,18 +16,23 @@ Controls:
     q              - quit
 
 Notes:
-    - Heartbeat ('H') is sent every HEARTBEAT_INTERVAL seconds.
+    - Heartbeat ('H') is sent whenever nothing else has been sent for
+      HEARTBEAT_INTERVAL seconds.
     - The robot-side watchdog triggers an emergency stop if no message arrives
       within WATCHDOG_TIMEOUT (2 s).
     - On TCP disconnect, the sender attempts to reconnect automatically.
 """
 
+import atexit
+import collections
 import logging
+import queue
 import signal
 import socket
 import sys
 import threading
 import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from pynput import keyboard
@@ -41,16 +46,23 @@ from config import (
 )
 
 # ── Logging ─────────────────────────────────────────────────────────────────
+# Keyboard callbacks and the tick/writer threads only enqueue records; a QueueListener
+# thread does the file + console writes, so a slow disk never delays a key event.
+# Started at import (not in main()) because main.py imports this module and relies on
+# this configuration — its own basicConfig() is a no-op once the root has a handler.
 _py_name = Path(__file__).stem
 Path("log").mkdir(exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(f"log/{_py_name}.log", encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
-)
+_log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+_log_file_handler = logging.FileHandler(f"log/{_py_name}.log", encoding="utf-8")
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(_log_formatter)
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, _log_file_handler, _log_stream_handler)
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+_log_listener.start()
+atexit.register(_log_listener.stop)  # flushes queued records on interpreter exit
 logger = logging.getLogger(__name__)
 
 CONTROL_KEYS = frozenset({"w", "s", "a", "d"})
@@ -58,27 +70,75 @@ STOP_CHAR: str = " "
 QUIT_KEY: str = "q"
 HEARTBEAT_CHAR: str = "H"
 
+# Pre-encoded command bytes — the send path does no per-call encoding or allocation
+_CMD_BYTES: dict[str, bytes] = {c: c.encode() for c in "wsad qH\r"}
+_HB: bytes = _CMD_BYTES[HEARTBEAT_CHAR]
+_STOP: bytes = _CMD_BYTES[STOP_CHAR]
+_ENTER: bytes = _CMD_BYTES["\r"]
+
+# pynput key object → outgoing bytes, built once at import so a key event costs one
+# dict probe (KeyCode hashes/compares by char, so listener events match these keys).
+# Keys not in the map are ignored; _QUIT is a sentinel, not a wire byte.
+_QUIT = object()
+_KEY_TO_BYTES: dict[object, object] = {
+    **{keyboard.KeyCode.from_char(c): _CMD_BYTES[c] for c in CONTROL_KEYS},
+    keyboard.KeyCode.from_char(QUIT_KEY): _QUIT,
+    keyboard.Key.enter: _ENTER,
+}
+
+# Windows virtual-key codes for the keys in _KEY_TO_BYTES (letters use their uppercase
+# ASCII code, VK_RETURN = 0x0D). Lets the Win32 hook drop every other key before a
+# Python callback is dispatched; see _win32_event_filter.
+_WATCHED_VKS = frozenset({*(ord(c.upper()) for c in CONTROL_KEYS), ord(QUIT_KEY.upper()), 0x0D})
+
+# With no key held, the repeat tick re-sends stop only every Nth tick (≈1 s at 10 Hz).
+# Stop is idempotent on the firmware; w/s/a/d are NOT (each byte adds ±0.1 to the
+# commanded speed), so held keys are still repeated on every tick.
+STOP_RESEND_TICKS: int = 10
+
 
 class RemoteSender:
     """Keyboard controller that sends commands to the robot over TCP.
 
     Thread layout:
-        - Heartbeat thread : sends 'H' every HEARTBEAT_INTERVAL seconds.
-        - Key-repeat thread : sends current key (or stop) at KEY_REPEAT_INTERVAL.
-        - Keyboard listener : pynput (may be called from main or a daemon thread).
+        - Writer thread     : the only socket writer; drains _tx_ring into one sendall().
+        - Tick thread       : one deadline loop that queues the current key (or stop)
+                              every KEY_REPEAT_INTERVAL, and 'H' once the link has been
+                              idle for HEARTBEAT_INTERVAL.
+        - Keyboard listener : pynput (may be called from main or a daemon thread);
+                              callbacks only queue bytes, never touch the socket.
     """
 
     def __init__(self) -> None:
+        # Published by plain attribute store (atomic under the GIL) — no lock. The socket
+        # object doubles as the connection generation: a send failure is acted on only
+        # if self._sock is still the socket that failed.
         self._sock: socket.socket | None = None
-        self._sock_lock = threading.Lock()
+        # Set by the writer on send failure; the single reconnect thread owns the socket lifecycle
+        self._reconnect_needed = threading.Event()
 
         self._running = False
-        self._pressed_keys: set[str] = set()
-        self._keys_lock = threading.Lock()
+        # Held control keys in press order; only the keyboard listener thread writes it.
+        # _active_key (newest held key, or None) is what the tick thread reads — a plain
+        # attribute store/load is atomic under the GIL, so neither side takes a lock.
+        self._held_keys: tuple[bytes, ...] = ()
+        self._active_key: bytes | None = None
         self._enter_held: bool = False
-
-        self._heartbeat_thread: threading.Thread | None = None
-        self._repeat_thread: threading.Thread | None = None
+        # Repeat ticks since stop was last queued while idle (0 → the next idle tick sends stop)
+        self._idle_ticks: int = 0
+
+        # Outgoing bytes: producers append, the writer thread popleft()s.
+        # deque append/popleft are atomic; maxlen drops the stalest command if the link stalls.
+        self._tx_ring: collections.deque[bytes] = collections.deque(maxlen=64)
+        self._tx_wake = threading.Event()
+        # time.monotonic() of the last successful send. The robot watchdog resets on ANY byte,
+        # so a heartbeat is only needed when nothing else went out for HEARTBEAT_INTERVAL.
+        self._last_tx: float = 0.0
+
+        self._reconnect_thread: threading.Thread | None = None
+        self._writer_thread: threading.Thread | None = None
+        self._tick_thread: threading.Thread | None = None
+        self._listener: keyboard.Listener | None = None
 
     # ── Public API ──────────────────────────────────────────────────────────
 
@@ -88,28 +148,42 @@ class RemoteSender:
         self._running = True
         self._connect()
 
-        self._heartbeat_thread = threading.Thread(
-            target=self._heartbeat_loop, daemon=True, name="heartbeat"
+        self._reconnect_thread = threading.Thread(
+            target=self._reconnect_loop, daemon=True, name="reconnect"
         )
-        self._heartbeat_thread.start()
+        self._reconnect_thread.start()
 
-        self._repeat_thread = threading.Thread(
-            target=self._key_repeat_loop, daemon=True, name="key_repeat"
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, daemon=True, name="tx_writer"
         )
-        self._repeat_thread.start()
+        self._writer_thread.start()
+
+        self._tick_thread = threading.Thread(
+            target=self._tick_loop, daemon=True, name="tick"
+        )
+        self._tick_thread.start()
 
         logger.info(
             "Remote sender started (wasd: move, space: stop, Enter: toggle state, q: quit)"
         )
         logger.info(f"Target: {ROBOT_HOST}:{TCP_PORT}")
 
+        # Block on the listener itself: it ends when _on_press returns False ('q') or
+        # stop() calls listener.stop() — no 50 ms polling loop competing with the callbacks
         with keyboard.Listener(
             on_press=self._on_press,
             on_release=self._on_release,
+            win32_event_filter=_win32_event_filter,
         ) as listener:
-            while self._running:
-                time.sleep(0.05)
-            listener.stop()
+            # Publish, then re-check: stop() clears _running before reading _listener, so
+            # a stop() racing this start either sees the listener or is seen here
+            self._listener = listener
+            if not self._running:
+                listener.stop()
+            # Timed join: an untimed Thread.join() on Windows holds off Python signal
+            # handlers (Ctrl+C / SIGTERM) until it returns; 0.5 s keeps them serviced
+            while listener.is_alive():
+                listener.join(0.5)
 
         logger.info("Keyboard listener stopped")
 
@@ -117,6 +191,11 @@ class RemoteSender:
         """Signal all threads to stop and close the socket."""
         logger.info("Stopping remote sender...")
         self._running = False
+        self._tx_wake.set()          # let the writer thread observe _running
+        self._reconnect_needed.set()  # ... and the reconnect thread
+        listener = self._listener
+        if listener is not None:
+            listener.stop()  # idempotent; run() stops a listener published after this read
         self._close_socket()
 
     # ── Connection management ────────────────────────────────────────────────
@@ -124,133 +203,207 @@ class RemoteSender:
     def _connect(self) -> None:
         """Try to connect (or reconnect) to the robot TCP server."""
         while self._running:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 sock.settimeout(5.0)
                 sock.connect((ROBOT_HOST, TCP_PORT))
                 sock.settimeout(None)
-                with self._sock_lock:
-                    self._sock = sock
+                # 1-byte commands: disable Nagle so each key goes out immediately
+                # instead of waiting on the previous segment's (delayed) ACK
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                # Latency over throughput: a small send buffer bounds how many stale commands
+                # can queue in the kernel while the robot stalls (1-byte traffic never fills it)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+                self._sock = sock
                 logger.info(f"Connected to robot at {ROBOT_HOST}:{TCP_PORT}")
                 return
             except OSError as e:
+                sock.close()
                 logger.warning(
                     f"TCP connect failed ({ROBOT_HOST}:{TCP_PORT}): {e}  "
                     f"— retrying in {TCP_RECONNECT_DELAY}s"
                 )
                 time.sleep(TCP_RECONNECT_DELAY)
 
-    def _close_socket(self) -> None:
-        with self._sock_lock:
-            if self._sock:
-                try:
-                    self._sock.close()
-                except OSError as e:
-                    logger.warning(f"Error closing socket: {e}")
-                self._sock = None
+    def _reconnect_loop(self) -> None:
+        """Sole reconnect path: wait for a send failure, then reconnect (one thread, ever)."""
+        while self._running:
+            self._reconnect_needed.wait()
+            # Clear first: a failure reported against the new socket must trigger another round
+            self._reconnect_needed.clear()
+            if self._running:
+                self._connect()
+
+    def _close_socket(self, expected: socket.socket | None = None) -> None:
+        """Unpublish and close the socket (only if it is still *expected*, when given)."""
+        sock = self._sock
+        if sock is None or (expected is not None and sock is not expected):
+            return
+        self._sock = None
+        try:
+            sock.close()
+        except OSError as e:
+            logger.warning(f"Error closing socket: {e}")
 
     # ── Send helper ─────────────────────────────────────────────────────────
 
-    def _send(self, char: str) -> None:
-        """Send a single character; reconnect silently on failure."""
-        with self._sock_lock:
-            sock = self._sock
+    def _enqueue(self, buf: bytes) -> None:
+        """Queue pre-encoded bytes for the writer thread; never blocks the caller."""
+        self._tx_ring.append(buf)
+        self._tx_wake.set()
 
+    def _send_bytes(self, buf: bytes) -> None:
+        """Send pre-encoded bytes; reconnect silently on failure."""
+        sock = self._sock
         if sock is None:
-            return
+            return  # reconnect in progress — drop; the repeat tick re-sends current state
 
         try:
-            sock.sendall(char.encode("utf-8"))
+            sock.sendall(buf)
+            self._last_tx = time.monotonic()
         except OSError as e:
+            if sock is not self._sock or not self._running:
+                return  # socket already replaced (or shutting down) — stale failure
             logger.warning(f"Send failed: {e} — attempting reconnect")
-            self._close_socket()
-            threading.Thread(
-                target=self._connect, daemon=True, name="reconnect"
-            ).start()
+            self._close_socket(sock)
+            self._reconnect_needed.set()
 
     # ── Background threads ───────────────────────────────────────────────────
 
-    def _heartbeat_loop(self) -> None:
-        logger.info(f"Heartbeat thread started (interval: {HEARTBEAT_INTERVAL}s)")
+    def _writer_loop(self) -> None:
+        # Bound once — these are called on every wake-up
+        ring = self._tx_ring
+        popleft = ring.popleft
+        wait = self._tx_wake.wait
+        clear = self._tx_wake.clear
+        send = self._send_bytes
         while self._running:
-            self._send(HEARTBEAT_CHAR)
-            time.sleep(HEARTBEAT_INTERVAL)
-
-    def _key_repeat_loop(self) -> None:
+            wait()
+            # Clear before draining: anything appended after this point re-sets the event
+            clear()
+            if not ring:
+                continue
+            buf = popleft()
+            while ring:
+                buf += popleft()
+            send(buf)
+
+    def _tick_loop(self) -> None:
+        """Key-repeat and idle heartbeat on one thread, each against its own monotonic deadline."""
         logger.info(
-            f"Key-repeat thread started (rate: {1.0 / KEY_REPEAT_INTERVAL:.0f} Hz)"
+            f"Tick thread started (key repeat: {1.0 / KEY_REPEAT_INTERVAL:.0f} Hz, "
+            f"heartbeat: {HEARTBEAT_INTERVAL}s)"
         )
+        # Bound once — this loop wakes at least KEY_REPEAT_INTERVAL⁻¹ times a second
+        monotonic = time.monotonic
+        sleep = time.sleep
+        repeat_tick = self._repeat_tick
+        enqueue = self._enqueue
+        repeat_interval = KEY_REPEAT_INTERVAL
+        hb_interval = HEARTBEAT_INTERVAL
+
+        next_repeat = next_hb = monotonic()
         while self._running:
-            with self._keys_lock:
-                active_keys = list(self._pressed_keys)
-
-            if active_keys:
-                self._send(active_keys[0])
-                logger.debug(f"Repeat send: {repr(active_keys[0])}")
-            else:
-                self._send(STOP_CHAR)
-
-            time.sleep(KEY_REPEAT_INTERVAL)
+            now = monotonic()
+            if now >= next_repeat:
+                repeat_tick()
+                next_repeat = _next_deadline(next_repeat, repeat_interval, now)
+            if now >= next_hb:
+                # Piggyback: any traffic since the last check already reset the robot watchdog
+                next_hb = self._last_tx + hb_interval
+                if now >= next_hb:
+                    enqueue(_HB)
+                    next_hb = now + hb_interval
+
+            dt = min(next_repeat, next_hb) - monotonic()
+            if dt > 0:
+                sleep(dt)
+
+    def _repeat_tick(self) -> None:
+        key = self._active_key
+        if key is not None:
+            self._enqueue(key)
+            self._idle_ticks = 0
+            logger.debug("Repeat send: %r", key)  # lazy %-args: no formatting unless DEBUG
+        else:
+            # Idle: skip duplicate stops, but re-assert one every STOP_RESEND_TICKS
+            if self._idle_ticks % STOP_RESEND_TICKS == 0:
+                self._enqueue(_STOP)
+            self._idle_ticks += 1
 
     # ── Keyboard callbacks ────────────────────────────────────────────────────
 
-    def _on_press(self, key) -> None:
-        char = _key_to_char(key)
-        if char is None:
+    def _on_press(self, key) -> bool | None:
+        buf = _KEY_TO_BYTES.get(key)
+        if buf is None:
             return
 
-        if char == QUIT_KEY:
+        if buf is _QUIT:
             logger.info("Quit key 'q' pressed, exiting...")
             self._running = False
-            return
+            return False  # pynput: returning False stops the listener
 
-        if char == "\r":
+        if buf is _ENTER:
             if not self._enter_held:
                 self._enter_held = True
                 logger.info("Enter pressed → sending state toggle")
-                self._send("\r")
+                self._enqueue(_ENTER)
             return
 
-        if char in CONTROL_KEYS:
-            with self._keys_lock:
-                if char not in self._pressed_keys:
-                    self._pressed_keys.add(char)
-                    logger.info(f"Key pressed: {repr(char)}")
-            self._send(char)
+        # Remaining entries are the w/s/a/d control keys
+        if buf not in self._held_keys:
+            self._held_keys += (buf,)
+            self._active_key = buf
+            logger.info("Key pressed: %r", buf)
+        self._enqueue(buf)
 
     def _on_release(self, key) -> None:
-        char = _key_to_char(key)
-        if char is None:
+        buf = _KEY_TO_BYTES.get(key)
+        if buf is None or buf is _QUIT:
             return
 
-        if char == "\r":
+        if buf is _ENTER:
             self._enter_held = False
             return
 
-        if char in CONTROL_KEYS:
-            with self._keys_lock:
-                self._pressed_keys.discard(char)
-                remaining = len(self._pressed_keys)
-            logger.debug(f"Key released: {repr(char)}, keys still held: {remaining}")
+        # Remaining entries are the w/s/a/d control keys
+        held = tuple(k for k in self._held_keys if k != buf)
+        self._held_keys = held
+        # Fall back to the most recent key still held (e.g. release 'a' while 'w' is down)
+        self._active_key = held[-1] if held else None
+        remaining = len(held)
+        logger.debug("Key released: %r, keys still held: %d", buf, remaining)
 
-            if remaining == 0:
-                self._send(STOP_CHAR)
-                logger.info("All keys released, stop sent")
+        if remaining == 0:
+            self._enqueue(_STOP)
+            self._idle_ticks = 1  # stop already sent — the next repeat tick need not repeat it
+            logger.info("All keys released, stop sent")
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
-def _key_to_char(key) -> str | None:
-    try:
-        if hasattr(key, "char") and key.char is not None:
-            return key.char
-        if key == keyboard.Key.space:
-            return " "
-        if key == keyboard.Key.enter:
-            return "\r"
-    except AttributeError:
-        pass
-    return None
+def _win32_event_filter(msg, data) -> bool:
+    """pynput Win32 hook filter: False keeps the event from reaching _on_press/_on_release.
+
+    The event itself still reaches other applications (this is not suppress=True).
+    pynput ignores win32_* options on other platforms; there, _on_press/_on_release
+    reject unwatched keys with a single _KEY_TO_BYTES lookup.
+    """
+    return data.vkCode in _WATCHED_VKS
+
+
+def _next_deadline(deadline: float, interval: float, now: float) -> float:
+    """Advance a monotonic *deadline* by one *interval*.
+
+    Scheduling against absolute deadlines keeps the mean period exact (send time and
+    wake-up jitter don't accumulate). If we have fallen a whole tick behind, the
+    schedule restarts from *now* instead of firing a burst of catch-up ticks.
+    """
+    deadline += interval
+    if deadline <= now:
+        deadline = now + interval
+    return deadline
 
 
 # ── Standalone entry point ────────────────────────────────────────────────────
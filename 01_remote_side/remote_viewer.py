@@ -12,24 +12,38 @@ Usage (standalone):
 Press 'q' in the video window to quit.
 
 Design:
-    - A background thread reads frames from cv2.VideoCapture (MJPEG URL).
-    - The main thread calls cv2.imshow (OpenCV requires the main thread).
-    - If no new frame arrives for STREAM_STALE_TIMEOUT seconds, the thread
-      closes and reopens cv2.VideoCapture (automatic reconnect).
+    - A background thread reads the multipart/x-mixed-replace HTTP response
+      directly and keeps only the newest JPEG part as raw bytes — parts the
+      display never shows are never decoded.
+    - A decode thread wakes when a part with new content arrives and
+      cv2.imdecode()s it, so a slow decode never stalls the socket reads.
+    - The main thread only shows the newest decoded frame with cv2.imshow
+      (OpenCV requires the main thread).
+    - If no data arrives for STREAM_STALE_TIMEOUT seconds, the thread closes
+      the HTTP connection and reopens it (automatic reconnect).
 """
 
+import collections
+import http.client
 import logging
+import random
 import signal
 import sys
 import threading
 import time
+import urllib.request
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import cv2
 import numpy as np
 
-from config import STREAM_RECONNECT_DELAY, STREAM_STALE_TIMEOUT, STREAM_URL
+from config import (
+    STREAM_RECONNECT_DELAY,
+    STREAM_RECONNECT_MAX_DELAY,
+    STREAM_STALE_TIMEOUT,
+    STREAM_URL,
+)
 
 # ── Logging ─────────────────────────────────────────────────────────────────
 _py_name = Path(__file__).stem
@@ -45,6 +59,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 WINDOW_NAME = "Robot Camera — press q to quit"
+DISPLAY_IDLE_POLL = 0.1  # s; run() wake-up interval while no new frame arrives
+MJPEG_MAX_PART_BYTES = 8 * 1024 * 1024  # guard against a stream that never delimits a part
+STREAM_STALE_NS = int(STREAM_STALE_TIMEOUT * 1e9)  # staleness check compares monotonic_ns ints
+PLACEHOLDER_SHAPE = (360, 640, 3)  # status frame size (H, W, BGR)
+RECONNECT_LOG_INTERVAL_NS = 1_000_000_000  # at most one reconnect-cycle log line per second
+WINDOW_PROP_INTERVAL_NS = 500_000_000  # close-button check period (~2 Hz); each check is a window-manager round trip
 
 
 class RemoteViewer:
@@ -56,26 +76,48 @@ class RemoteViewer:
 
     def __init__(self, stream_url: str = STREAM_URL) -> None:
         self._url = stream_url
-        self._latest_frame: Optional[np.ndarray] = None
-        self._frame_lock = threading.Lock()
-        self._last_frame_time: float = 0.0
+        # Newest-wins single slots: the capture thread appends raw JPEG bytes to _jpegs,
+        # the decode thread peeks at [-1] and appends the BGR frame to _frames for run().
+        # deque append/clear/index are atomic in CPython, so no lock is needed.
+        self._jpegs: collections.deque[bytes] = collections.deque(maxlen=1)
+        self._frames: collections.deque[np.ndarray] = collections.deque(maxlen=1)
+        self._last_frame_ns: int = 0  # time.monotonic_ns() of the last part; 0 = none yet
+        # Set by the capture thread when a part with new content arrives; the decode thread sleeps on it
+        self._new_part = threading.Event()
+        # Set by the decode thread when _frames changes; run() sleeps on it
+        self._new_frame = threading.Event()
+
+        # Reconnect-cycle log throttle (capture thread only)
+        self._next_log_ns = 0
+        self._suppressed_logs = 0
 
         self._running = False
         self._capture_thread: Optional[threading.Thread] = None
+        self._decode_thread: Optional[threading.Thread] = None
+
+        # Status frames: allocated once, redrawn in place by start() and reused by run()
+        self._placeholder_connecting = np.empty(PLACEHOLDER_SHAPE, dtype=np.uint8)
+        self._placeholder_lost = np.empty(PLACEHOLDER_SHAPE, dtype=np.uint8)
 
     # ── Public API ──────────────────────────────────────────────────────────
 
     def start(self) -> None:
-        """Launch the background frame-capture thread."""
+        """Launch the background frame-capture and decode threads."""
         self._running = True
+        self._draw_status(self._placeholder_connecting, "Connecting to robot camera...")
+        self._draw_status(self._placeholder_lost, "Stream lost — reconnecting...")
         self._capture_thread = threading.Thread(
             target=self._capture_loop, daemon=True, name="frame_capture"
         )
+        self._decode_thread = threading.Thread(
+            target=self._decode_loop, daemon=True, name="frame_decode"
+        )
         self._capture_thread.start()
-        logger.info(f"Remote viewer started, stream URL: {self._url}")
+        self._decode_thread.start()
+        logger.info("Remote viewer started, stream URL: %s", self._url)
 
     def stop(self) -> None:
-        """Signal the capture thread to stop."""
+        """Signal the capture and decode threads to stop."""
         self._running = False
         logger.info("Remote viewer stopped")
 
@@ -85,39 +127,56 @@ class RemoteViewer:
         Returns when the user presses 'q' or closes the window.
         """
         cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-        placeholder = self._make_placeholder("Connecting to robot camera...")
+        placeholder_connecting = self._placeholder_connecting
+        placeholder_lost = self._placeholder_lost
 
+        shown: Optional[np.ndarray] = None
+        next_prop_check = 0  # time.monotonic_ns() of the next window-close check
         while self._running:
-            with self._frame_lock:
-                frame = self._latest_frame
-
-            display = frame if frame is not None else placeholder
-
-            # Check staleness and update placeholder text
-            if frame is None or (
-                self._last_frame_time > 0
-                and (time.time() - self._last_frame_time) > STREAM_STALE_TIMEOUT
-            ):
-                display = self._make_placeholder("Stream lost — reconnecting...")
+            # Wake on a new frame; the timeout keeps GUI events, 'q' and the
+            # staleness check serviced (≥ 10 Hz) while no frames arrive
+            self._new_frame.wait(timeout=DISPLAY_IDLE_POLL)
+            self._new_frame.clear()
 
             try:
-                cv2.imshow(WINDOW_NAME, display)
-            except cv2.error as e:
-                logger.error(f"cv2.imshow error: {e}")
-                break
+                frame = self._frames[-1]
+            except IndexError:
+                frame = None
+
+            now = time.monotonic_ns()
+
+            # Pick a cached placeholder when there is nothing (fresh) to show
+            if frame is None:
+                display = placeholder_lost if self._last_frame_ns != 0 else placeholder_connecting
+            elif (now - self._last_frame_ns) > STREAM_STALE_NS:
+                display = placeholder_lost
+            else:
+                display = frame
+
+            # HighGUI keeps the last image for repaints, so only push a changed one
+            if display is not shown:
+                try:
+                    cv2.imshow(WINDOW_NAME, display)
+                except cv2.error as e:
+                    logger.error("cv2.imshow error: %s", e)
+                    break
+                shown = display
 
-            key = cv2.waitKey(30) & 0xFF
+            # pollKey(): process GUI events without waitKey()'s fixed sleep
+            key = cv2.pollKey() & 0xFF
             if key == ord("q"):
                 logger.info("'q' pressed in video window, quitting viewer")
                 break
 
-            # Window close button
-            try:
-                if cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
-                    logger.info("Video window closed, quitting viewer")
+            # Window close button, polled at ~2 Hz rather than on every frame
+            if now >= next_prop_check:
+                next_prop_check = now + WINDOW_PROP_INTERVAL_NS
+                try:
+                    if cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
+                        logger.info("Video window closed, quitting viewer")
+                        break
+                except cv2.error:
                     break
-            except cv2.error:
-                break
 
         self.stop()
         cv2.destroyAllWindows()
@@ -125,53 +184,135 @@ class RemoteViewer:
     # ── Internal ────────────────────────────────────────────────────────────
 
     def _capture_loop(self) -> None:
-        """Background thread: continuously reads frames from MJPEG stream."""
+        """Background thread: continuously reads JPEG parts from the MJPEG stream."""
         logger.info("Capture thread started")
+        # Bound once: the per-part path below runs for every part on the wire
+        monotonic_ns = time.monotonic_ns
+        append = self._jpegs.append
+        notify = self._new_part.set
+        prev_jpeg = b""
+        attempt = 0  # consecutive failed opens; drives the reconnect backoff
         while self._running:
-            cap = self._open_capture()
-            if cap is None:
-                time.sleep(STREAM_RECONNECT_DELAY)
+            opened = self._open_stream()
+            if opened is None:
+                time.sleep(_backoff_delay(attempt))
+                attempt += 1
                 continue
+            resp, boundary = opened
+            attempt = 0
 
-            logger.info("Stream opened, reading frames")
-            while self._running:
-                ret, frame = cap.read()
-                if not ret or frame is None:
-                    logger.warning("Frame read failed — stream may have dropped")
-                    break
-
-                with self._frame_lock:
-                    self._latest_frame = frame
-                    self._last_frame_time = time.time()
+            self._log_reconnect(logging.INFO, "Stream opened, reading frames")
+            try:
+                for jpeg in _iter_mjpeg_parts(resp, boundary):
+                    self._last_frame_ns = monotonic_ns()
+                    # MJPEGServer re-sends its latest JPEG until the camera produces a new
+                    # one; a byte compare is far cheaper than waking the decode thread for a duplicate
+                    if jpeg != prev_jpeg:
+                        prev_jpeg = jpeg
+                        append(jpeg)
+                        notify()
+                    if not self._running:
+                        break
+                else:
+                    self._log_reconnect(logging.WARNING, "Stream ended — robot closed the connection")
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                # Includes the socket read timeout (no data for STREAM_STALE_TIMEOUT)
+                self._log_reconnect(logging.WARNING, "Frame read failed — stream may have dropped: %s", e)
+            finally:
+                resp.close()
 
-            cap.release()
             if self._running:
-                logger.info(
-                    f"Stream disconnected, retrying in {STREAM_RECONNECT_DELAY}s..."
-                )
-                with self._frame_lock:
-                    self._latest_frame = None
-                time.sleep(STREAM_RECONNECT_DELAY)
+                delay = _backoff_delay(0)
+                self._log_reconnect(logging.INFO, "Stream disconnected, retrying in %.1fs...", delay)
+                self._jpegs.clear()
+                prev_jpeg = b""
+                self._new_part.set()  # let the decode thread drop the last frame now
+                time.sleep(delay)
 
         logger.info("Capture thread exiting")
 
-    def _open_capture(self) -> Optional[cv2.VideoCapture]:
-        """Try to open the MJPEG stream.  Returns None on failure."""
+    def _decode_loop(self) -> None:
+        """Background thread: decodes the newest JPEG part into a BGR frame for run().
+
+        cv2.imdecode releases the GIL, so decoding runs alongside the socket reads
+        instead of delaying them; parts that arrive mid-decode are simply superseded.
+        """
+        logger.info("Decode thread started")
+        jpegs = self._jpegs
+        frames = self._frames
+        wait = self._new_part.wait
+        clear = self._new_part.clear
+        notify = self._new_frame.set
+        decoded_jpeg: Optional[bytes] = None
+        while self._running:
+            if not wait(timeout=DISPLAY_IDLE_POLL):
+                continue
+            clear()
+            try:
+                jpeg = jpegs[-1]
+            except IndexError:
+                # Capture thread dropped the stream: drop the last frame too
+                if decoded_jpeg is not None:
+                    decoded_jpeg = None
+                    frames.clear()
+                    notify()
+                continue
+            if jpeg is decoded_jpeg:
+                continue
+            decoded_jpeg = jpeg
+            # A corrupt part keeps the last good frame
+            frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                frames.append(frame)
+                notify()
+        logger.info("Decode thread exiting")
+
+    def _open_stream(self) -> Optional[tuple[http.client.HTTPResponse, bytes]]:
+        """Open the MJPEG HTTP stream.  Returns (response, boundary) or None on failure.
+
+        The socket timeout doubles as the stale-stream detector: a read that gets
+        no data for STREAM_STALE_TIMEOUT seconds raises and triggers a reconnect.
+        """
         try:
-            cap = cv2.VideoCapture(self._url)
-            if not cap.isOpened():
-                logger.warning(f"Cannot open stream: {self._url}")
-                cap.release()
-                return None
-            return cap
-        except Exception as e:
-            logger.error(f"Error opening VideoCapture: {e}")
+            resp = urllib.request.urlopen(self._url, timeout=STREAM_STALE_TIMEOUT)
+        except (OSError, http.client.HTTPException) as e:
+            self._log_reconnect(logging.WARNING, "Cannot open stream %s: %s", self._url, e)
+            return None
+
+        boundary = resp.headers.get_param("boundary")
+        if resp.headers.get_content_type() != "multipart/x-mixed-replace" or not boundary:
+            self._log_reconnect(
+                logging.ERROR, "Not an MJPEG stream (%s): %s", resp.headers.get("Content-Type"), self._url
+            )
+            resp.close()
             return None
+        return resp, boundary.encode("latin-1")
+
+    def _log_reconnect(self, level: int, msg: str, *args) -> None:
+        """Log a reconnect-cycle message, at most once per RECONNECT_LOG_INTERVAL_NS.
+
+        A robot that is down or flapping makes the capture loop repeat the same
+        open/fail/retry lines on every attempt; messages inside the interval are
+        counted and the count is reported with the next line that gets through.
+        """
+        now = time.monotonic_ns()
+        if now < self._next_log_ns:
+            self._suppressed_logs += 1
+            return
+        self._next_log_ns = now + RECONNECT_LOG_INTERVAL_NS
+        if self._suppressed_logs:
+            msg += " (%d reconnect messages suppressed)"
+            args += (self._suppressed_logs,)
+            self._suppressed_logs = 0
+        logger.log(level, msg, *args)
 
     @staticmethod
-    def _make_placeholder(text: str) -> np.ndarray:
-        """Return a dark frame with a status message."""
-        img = np.zeros((360, 640, 3), dtype=np.uint8)
+    def _draw_status(img: np.ndarray, text: str) -> np.ndarray:
+        """Redraw img in place as a dark frame with a status message, and return it.
+
+        Reuses the caller's buffer (ndarray.fill) instead of allocating a new frame per message.
+        """
+        img.fill(0)
         cv2.putText(
             img, text,
             (20, 180),
@@ -184,13 +325,86 @@ class RemoteViewer:
         return img
 
 
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+def _backoff_delay(attempt: int) -> float:
+    """Reconnect delay: capped exponential backoff with ±50 % jitter.
+
+    STREAM_RECONNECT_DELAY × 2^attempt, capped at STREAM_RECONNECT_MAX_DELAY, so a
+    brief blip retries quickly while a rebooting robot isn't polled at a fixed rate;
+    the jitter keeps several viewers from retrying in lockstep.
+    """
+    delay = min(STREAM_RECONNECT_MAX_DELAY, STREAM_RECONNECT_DELAY * (2 ** min(attempt, 16)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+# ── MJPEG multipart parser ────────────────────────────────────────────────────
+
+def _iter_mjpeg_parts(stream, boundary: bytes) -> Iterator[bytes]:
+    """Yield the body of each part of a multipart/x-mixed-replace byte stream.
+
+    Uses a part's Content-Length when present; otherwise the body runs up to the
+    next CRLF ``--boundary`` (the robot's MJPEGServer sends no Content-Length).
+    Returns at EOF; raises ValueError if a part grows past MJPEG_MAX_PART_BYTES.
+    """
+    delim = b"--" + boundary
+    body_delim = b"\r\n" + delim
+    buf = bytearray()
+    scan = 0  # where the search for the end of the current body resumes
+    while True:
+        chunk = stream.read1(65536)
+        if not chunk:
+            return
+        buf += chunk
+        while True:
+            start = buf.find(delim)
+            if start < 0:
+                del buf[:-len(delim)]  # keep only a possibly split delimiter
+                break
+            if start:
+                del buf[:start]
+                scan = max(0, scan - start)
+            hdr_end = buf.find(b"\r\n\r\n", len(delim))
+            if hdr_end < 0:
+                break
+            body_start = hdr_end + 4
+            length = _content_length(bytes(buf[len(delim):hdr_end]))
+            if length is not None:
+                body_end = body_start + length
+                if body_end > len(buf):
+                    break
+            else:
+                body_end = buf.find(body_delim, max(body_start, scan))
+                if body_end < 0:
+                    # Resume just before the tail, in case the delimiter is split across reads
+                    scan = max(body_start, len(buf) - len(body_delim))
+                    break
+            yield bytes(buf[body_start:body_end])
+            del buf[:body_end]
+            scan = 0
+        if len(buf) > MJPEG_MAX_PART_BYTES:
+            raise ValueError(f"MJPEG part exceeds {MJPEG_MAX_PART_BYTES} bytes")
+
+
+def _content_length(headers: bytes) -> int | None:
+    """Return the Content-Length of a part header block, or None if absent."""
+    for line in headers.split(b"\r\n"):
+        name, sep, value = line.partition(b":")
+        if sep and name.strip().lower() == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
 # ── Standalone entry point ────────────────────────────────────────────────────
 
 def main() -> None:
     viewer = RemoteViewer()
 
     def _signal_handler(signum, frame):
-        logger.info(f"Signal {signum} received, stopping viewer...")
+        logger.info("Signal %s received, stopping viewer...", signum)
         viewer.stop()
         cv2.destroyAllWindows()
         sys.exit(0)
@@ -202,7 +416,7 @@ def main() -> None:
         viewer.start()
         viewer.run()   # blocks until user quits
     except Exception as e:
-        logger.error(f"Remote viewer fatal error: {e}")
+        logger.error("Remote viewer fatal error: %s", e)
         raise
     finally:
         viewer.stop()
@@ -23,6 +23,8 @@ from farm_ng.utils.packet import DASHBOARD_NODE_ID
 from farm_ng.utils.ticks import TickRepeater
 from usb_cdc import console
 
+V_LINE_MAX = 32  # longest plausible "V-1.00,-1.00\r\n"; a longer partial line is dropped as garbage
+
 
 class HelloMainLoopApp:
     def __init__(self, main_loop: MainLoop, can, node_id) -> None:
@@ -37,7 +39,12 @@ class HelloMainLoopApp:
         self.request_state = AmigaControlState.STATE_AUTO_READY
         self.inc = 0.1
 
-        self._line_buf = []  # line buffer for multi-byte V commands
+        self._line_buf = b""  # partial V command carried over to the next serial_read()
+
+        # RPDO1 packet + CAN message built once and refilled every tick (20 Hz) instead of
+        # allocating a new AmigaRpdo1 and Message each time; canio copies .data on assignment
+        self._rpdo1 = AmigaRpdo1(state_req=self.request_state)
+        self._rpdo1_msg = Message(id=CanOpenObject.RPDO1 | DASHBOARD_NODE_ID, data=self._rpdo1.encode())
 
         self._register_message_handlers()
         console.write(b"S:READY\n")  # notify host of initial firmware state on startup
@@ -76,42 +83,71 @@ class HelloMainLoopApp:
             self.cmd_ang_rate -= self.inc
 
     def parse_velocity_cmd(self, line):
-        """Parse 'V{speed},{ang_rate}\\n' direct velocity command; clamps to [-1.0, 1.0]."""
+        """Parse b'V{speed},{ang_rate}' (newline already stripped) direct velocity command; clamps to [-1.0, 1.0]."""
+        # Validate the shape up front (exactly one comma, both fields non-empty) so a
+        # malformed line is rejected without raising; only float() can still fail
+        comma = line.find(b",")
+        if comma <= 1 or comma == len(line) - 1 or line.find(b",", comma + 1) >= 0:
+            return
         try:
-            parts = line[1:].split(',')
-            if len(parts) == 2:
-                self.cmd_speed    = max(-1.0, min(1.0, float(parts[0])))
-                self.cmd_ang_rate = max(-1.0, min(1.0, float(parts[1])))
-        except (ValueError, IndexError):
-            pass  # ignore malformed command
+            speed = float(line[1:comma].decode("ascii"))
+            ang_rate = float(line[comma + 1:].decode("ascii"))
+        except ValueError:
+            return  # ignore malformed command
+        self.cmd_speed    = _clamp_unit(speed)
+        self.cmd_ang_rate = _clamp_unit(ang_rate)
 
     def serial_read(self):
-        while console.in_waiting > 0:
-            char = console.read().decode("ascii")
-            # V command (multi-byte line protocol)
-            if char == 'V' or self._line_buf:
-                self._line_buf.append(char)
-                if char == '\n':
-                    line = ''.join(self._line_buf).strip()
-                    self._line_buf.clear()
-                    if line.startswith('V'):
-                        self.parse_velocity_cmd(line)
+        n = console.in_waiting
+        if not n:
+            return
+        # One USB-CDC read for everything waiting, instead of one read (and one str) per byte
+        data = console.read(n)
+        n = len(data)
+        i = 0
+        if self._line_buf:
+            # Finish a V command that was split across reads
+            j = data.find(b"\n")
+            if j < 0:
+                self._line_buf += data
+                if len(self._line_buf) > V_LINE_MAX:
+                    self._line_buf = b""
+                return
+            self.parse_velocity_cmd((self._line_buf + data[:j]).strip())
+            self._line_buf = b""
+            i = j + 1
+        while i < n:
+            b = data[i]
+            if b == 0x56:  # 'V': multi-byte line protocol, runs up to '\n'
+                j = data.find(b"\n", i)
+                if j < 0:
+                    self._line_buf = data[i:]
+                    return
+                self.parse_velocity_cmd(data[i:j].strip())
+                i = j + 1
             else:
                 # Legacy single-byte WASD protocol
-                self.parse_wasd_cmd(char)
+                self.parse_wasd_cmd(chr(b))
+                i += 1
 
     def iter(self):
         self.serial_read()
 
         if self.cmd_repeater.check():
-            self.can.send(
-                Message(
-                    id=CanOpenObject.RPDO1 | DASHBOARD_NODE_ID,
-                    data=AmigaRpdo1(
-                        state_req=self.request_state, cmd_speed=self.cmd_speed, cmd_ang_rate=self.cmd_ang_rate
-                    ).encode(),
-                )
-            )
+            rpdo1 = self._rpdo1
+            rpdo1.state_req = self.request_state
+            rpdo1.cmd_speed = self.cmd_speed
+            rpdo1.cmd_ang_rate = self.cmd_ang_rate
+            msg = self._rpdo1_msg
+            msg.data = rpdo1.encode()
+            self.can.send(msg)
+
+
+def _clamp_unit(x):
+    """Clamp to [-1.0, 1.0] with plain comparisons (no min()/max() calls); NaN maps to 0.0 (stop)."""
+    if x != x:
+        return 0.0  # NaN: both comparisons below are False, and AmigaRpdo1.encode() would raise on it
+    return -1.0 if x < -1.0 else (1.0 if x > 1.0 else x)
 
 
 def main():